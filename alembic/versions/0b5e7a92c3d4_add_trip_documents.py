@@ -0,0 +1,33 @@
+"""add trip_documents
+
+Revision ID: 0b5e7a92c3d4
+Revises: f19b6d3a7c58
+Create Date: 2026-10-18 12:30:52.407719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e7a92c3d4'
+down_revision: Union[str, None] = 'f19b6d3a7c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Filled lazily on first read of each trip, then rewritten on every trip write
+    op.create_table(
+        'trip_documents',
+        sa.Column('trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('version', sa.String(32), nullable=False),
+        sa.Column('document', sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'), nullable=False),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+
+def downgrade():
+    op.drop_table('trip_documents')
@@ -0,0 +1,89 @@
+"""add trip_departures date index
+
+Revision ID: 3c71d8e2a4f0
+Revises: 9e3d7b1c5a26
+Create Date: 2026-10-18 14:47:09.214836
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3c71d8e2a4f0'
+down_revision: Union[str, None] = '9e3d7b1c5a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _parse_date(value):
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def upgrade():
+    trip_departures = op.create_table(
+        'trip_departures',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('source', sa.String(20), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=True),
+        sa.Column('title', sa.String(255), nullable=True),
+        sa.Column('start_date', sa.DateTime(), nullable=False),
+        sa.Column('end_date', sa.DateTime(), nullable=True),
+        sa.Column('available_slots', sa.Integer(), nullable=True),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('packages', sa.Text(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+
+    # Backfill: fixed_departure[*] of every trip's pricing JSON ...
+    conn = op.get_bind()
+    rows = []
+    pricing = conn.execute(sa.text("""
+        SELECT t.id, t.user_id, p.data
+        FROM trip_pricing p JOIN trips t ON t.id = p.trip_id
+    """)).fetchall()
+    for trip_id, user_id, data in pricing:
+        try:
+            parsed = json.loads(data) if data else {}
+        except ValueError:
+            continue
+        if parsed.get("pricing_model") != "fixed_departure":
+            continue
+        for fd in parsed.get("fixed_departure") or []:
+            start_date = _parse_date(fd.get("from_date"))
+            if start_date is None:
+                continue
+            packages = fd.get("costingPackages") or []
+            prices = [p.get("final_price") for p in packages if isinstance(p.get("final_price"), (int, float))]
+            rows.append({
+                "trip_id": trip_id, "user_id": user_id, "source": "pricing", "source_id": None,
+                "title": fd.get("title"), "start_date": start_date, "end_date": _parse_date(fd.get("to_date")),
+                "available_slots": fd.get("available_slots"), "min_price": min(prices) if prices else None,
+                "packages": json.dumps(packages), "is_deleted": False,
+            })
+    if rows:
+        op.bulk_insert(trip_departures, rows)
+
+    # ... and the fixed_departures table
+    conn.execute(sa.text("""
+        INSERT INTO trip_departures (trip_id, user_id, source, source_id, title, start_date, end_date, is_deleted)
+        SELECT f.trip_id, t.user_id, 'fixed_departure', f.id, f.title, f.start_date, f.end_date, 0
+        FROM fixed_departures f JOIN trips t ON t.id = f.trip_id
+    """))
+
+    op.create_index('idx_trip_departures_user_start', 'trip_departures', ['user_id', 'start_date'])
+    op.create_index('idx_trip_departures_trip_source', 'trip_departures', ['trip_id', 'source'])
+
+
+def downgrade():
+    op.drop_index('idx_trip_departures_trip_source', table_name='trip_departures')
+    op.drop_index('idx_trip_departures_user_start', table_name='trip_departures')
+    op.drop_table('trip_departures')
@@ -0,0 +1,54 @@
+"""add trip_search fulltext index
+
+Revision ID: 5a8c2e6f9b14
+Revises: 0b5e7a92c3d4
+Create Date: 2026-10-18 13:05:26.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8c2e6f9b14'
+down_revision: Union[str, None] = '0b5e7a92c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'trip_search',
+        sa.Column('trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('title', sa.String(255), nullable=True),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+
+    # Backfill before the FULLTEXT indexes exist: one bulk index build instead of per-row updates
+    conn = op.get_bind()
+    conn.execute(sa.text("SET SESSION group_concat_max_len = 1048576"))
+    conn.execute(sa.text("""
+        INSERT INTO trip_search (trip_id, title, body, is_deleted)
+        SELECT
+            t.id,
+            t.title,
+            CONCAT_WS('\\n',
+                t.overview, t.highlights, t.inclusions,
+                (SELECT GROUP_CONCAT(i.title ORDER BY i.day_number SEPARATOR '\\n')
+                 FROM itineraries i WHERE i.trip_id = t.id),
+                d.title
+            ),
+            0
+        FROM trips t
+        LEFT JOIN destinations d ON d.id = t.destination_id
+    """))
+
+    op.create_index('ft_trip_search_title', 'trip_search', ['title'], mysql_prefix='FULLTEXT')
+    op.create_index('ft_trip_search_title_body', 'trip_search', ['title', 'body'], mysql_prefix='FULLTEXT')
+
+def downgrade():
+    op.drop_index('ft_trip_search_title_body', table_name='trip_search')
+    op.drop_index('ft_trip_search_title', table_name='trip_search')
+    op.drop_table('trip_search')
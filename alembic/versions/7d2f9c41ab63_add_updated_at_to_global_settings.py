@@ -0,0 +1,28 @@
+"""add updated_at to global_settings
+
+Revision ID: 7d2f9c41ab63
+Revises: 15bea4df9dd5
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f9c41ab63'
+down_revision: Union[str, None] = '15bea4df9dd5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Version column for the GET /api/site-settings/ ETag; existing rows start at now()
+    op.add_column(
+        'global_settings',
+        sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.func.now())
+    )
+
+def downgrade():
+    op.drop_column('global_settings', 'updated_at')
@@ -0,0 +1,85 @@
+"""add trip price summary columns
+
+Revision ID: 9e3d7b1c5a26
+Revises: 5a8c2e6f9b14
+Create Date: 2026-10-18 14:02:41.530177
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3d7b1c5a26'
+down_revision: Union[str, None] = '5a8c2e6f9b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _price_fields(data: str) -> dict:
+    # Frozen copy of crud.trip.derive_trip_price_fields as of this revision
+    try:
+        pricing = json.loads(data) if data else {}
+    except ValueError:
+        pricing = {}
+
+    prices, departures = [], []
+    if pricing.get("pricing_model") == "fixed_departure":
+        for fd in pricing.get("fixed_departure") or []:
+            prices.extend(p.get("final_price") for p in fd.get("costingPackages") or [])
+            try:
+                departures.append(datetime.fromisoformat(str(fd.get("from_date")).replace("Z", "+00:00")).replace(tzinfo=None))
+            except ValueError:
+                pass
+    else:
+        prices.append((pricing.get("customized") or {}).get("final_price"))
+
+    prices = [float(p) for p in prices if isinstance(p, (int, float))]
+    now = datetime.now()
+    upcoming = [d for d in departures if d >= now]
+    return {
+        "min_price": min(prices) if prices else None,
+        "max_price": max(prices) if prices else None,
+        "currency": (pricing.get("currency") or "INR") if prices else None,
+        "next_departure": min(upcoming) if upcoming else None,
+    }
+
+
+def upgrade():
+    op.add_column('trips', sa.Column('min_price', sa.Float(), nullable=True))
+    op.add_column('trips', sa.Column('max_price', sa.Float(), nullable=True))
+    op.add_column('trips', sa.Column('currency', sa.String(3), nullable=True))
+    op.add_column('trips', sa.Column('next_departure', sa.DateTime(), nullable=True))
+
+    # Backfill from trip_pricing.data; updated_at is left alone (plain UPDATE, no ORM onupdate)
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT trip_id, data FROM trip_pricing")).fetchall()
+    for trip_id, data in rows:
+        conn.execute(
+            sa.text("""
+                UPDATE trips
+                SET min_price = :min_price, max_price = :max_price,
+                    currency = :currency, next_departure = :next_departure
+                WHERE id = :trip_id
+            """),
+            {"trip_id": trip_id, **_price_fields(data)},
+        )
+
+    # Stored documents predate the new fields and their versions did not move
+    conn.execute(sa.text("DELETE FROM trip_documents"))
+
+    op.create_index('idx_trips_user_min_price_id', 'trips', ['user_id', 'min_price', 'id'])
+    op.create_index('idx_trips_user_next_departure', 'trips', ['user_id', 'next_departure'])
+
+
+def downgrade():
+    op.drop_index('idx_trips_user_next_departure', table_name='trips')
+    op.drop_index('idx_trips_user_min_price_id', table_name='trips')
+    op.drop_column('trips', 'next_departure')
+    op.drop_column('trips', 'currency')
+    op.drop_column('trips', 'max_price')
+    op.drop_column('trips', 'min_price')
+    op.execute("DELETE FROM trip_documents")
@@ -0,0 +1,45 @@
+"""add position to itineraries and trip_policies
+
+Revision ID: b4f2d9a7e613
+Revises: e8a4b6f1c302
+Create Date: 2026-10-18 17:04:21.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f2d9a7e613'
+down_revision: Union[str, None] = 'e8a4b6f1c302'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('itineraries', sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('trip_policies', sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+
+    # Existing rows keep the order they were read in so far
+    op.execute("""
+        UPDATE itineraries i
+        JOIN (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY trip_id ORDER BY day_number, id) - 1 AS position
+            FROM itineraries
+        ) ranked ON ranked.id = i.id
+        SET i.position = ranked.position
+    """)
+    op.execute("""
+        UPDATE trip_policies p
+        JOIN (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY trip_id ORDER BY id) - 1 AS position
+            FROM trip_policies
+        ) ranked ON ranked.id = p.id
+        SET p.position = ranked.position
+    """)
+
+
+def downgrade():
+    op.drop_column('trip_policies', 'position')
+    op.drop_column('itineraries', 'position')
@@ -0,0 +1,62 @@
+"""add trip_categories and trip_themes
+
+Revision ID: c4e8a1f0d2b7
+Revises: 7d2f9c41ab63
+Create Date: 2026-10-18 11:02:17.554190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f0d2b7'
+down_revision: Union[str, None] = '7d2f9c41ab63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade():
+    # is_deleted: every model gets it patched in by add_is_deleted_to_all_models()
+    trip_categories = op.create_table(
+        'trip_categories',
+        sa.Column('trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('category_id', sa.Integer(), primary_key=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+    op.create_index('idx_trip_categories_category_trip', 'trip_categories', ['category_id', 'trip_id'])
+
+    trip_themes = op.create_table(
+        'trip_themes',
+        sa.Column('trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('theme', sa.String(100), primary_key=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+    op.create_index('idx_trip_themes_theme_trip', 'trip_themes', ['theme', 'trip_id'])
+
+    # Backfill from the comma-separated trips.category_id / trips.themes columns
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, category_id, themes FROM trips")).fetchall()
+
+    category_rows, theme_rows = [], []
+    for trip_id, category_csv, themes_csv in rows:
+        categories = {int(v.strip()) for v in (category_csv or "").split(",") if v.strip().isdigit()}
+        # Keyed case-insensitively, like the MySQL collation on the primary key
+        themes = {v.strip()[:100].lower(): v.strip()[:100] for v in (themes_csv or "").split(",") if v.strip()}.values()
+        category_rows.extend({"trip_id": trip_id, "category_id": c, "is_deleted": False} for c in categories)
+        theme_rows.extend({"trip_id": trip_id, "theme": t, "is_deleted": False} for t in themes)
+
+    for start in range(0, len(category_rows), BACKFILL_BATCH_SIZE):
+        op.bulk_insert(trip_categories, category_rows[start:start + BACKFILL_BATCH_SIZE])
+    for start in range(0, len(theme_rows), BACKFILL_BATCH_SIZE):
+        op.bulk_insert(trip_themes, theme_rows[start:start + BACKFILL_BATCH_SIZE])
+
+def downgrade():
+    # trips.category_id / trips.themes are still written, nothing to restore
+    op.drop_index('idx_trip_themes_theme_trip', table_name='trip_themes')
+    op.drop_table('trip_themes')
+    op.drop_index('idx_trip_categories_category_trip', table_name='trip_categories')
+    op.drop_table('trip_categories')
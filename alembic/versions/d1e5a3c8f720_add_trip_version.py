@@ -0,0 +1,27 @@
+"""add trips.version counter
+
+Revision ID: d1e5a3c8f720
+Revises: b4f2d9a7e613
+Create Date: 2026-10-18 17:26:48.905132
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1e5a3c8f720'
+down_revision: Union[str, None] = 'b4f2d9a7e613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Stored trip documents keyed by the old updated_at version are simply
+    # regenerated on their next read
+    op.add_column('trips', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    op.drop_column('trips', 'version')
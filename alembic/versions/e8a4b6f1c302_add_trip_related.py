@@ -0,0 +1,36 @@
+"""add trip_related top-k table
+
+Revision ID: e8a4b6f1c302
+Revises: 3c71d8e2a4f0
+Create Date: 2026-10-18 15:31:52.640713
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a4b6f1c302'
+down_revision: Union[str, None] = '3c71d8e2a4f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Filled by the application: incrementally on every trip write, and in the
+    # background after the first read of a trip saved before this table existed
+    op.create_table(
+        'trip_related',
+        sa.Column('trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('rank', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('related_trip_id', sa.Integer(), sa.ForeignKey('trips.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+    op.create_index('idx_trip_related_related', 'trip_related', ['related_trip_id'])
+
+
+def downgrade():
+    op.drop_index('idx_trip_related_related', table_name='trip_related')
+    op.drop_table('trip_related')
@@ -0,0 +1,26 @@
+"""add trip keyset pagination indexes
+
+Revision ID: f19b6d3a7c58
+Revises: c4e8a1f0d2b7
+Create Date: 2026-10-18 11:47:05.913422
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19b6d3a7c58'
+down_revision: Union[str, None] = 'c4e8a1f0d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index('idx_trips_user_created_id', 'trips', ['user_id', 'created_at', 'id'])
+    op.create_index('idx_trips_user_display_order_id', 'trips', ['user_id', 'display_order', 'id'])
+
+def downgrade():
+    op.drop_index('idx_trips_user_display_order_id', table_name='trips')
+    op.drop_index('idx_trips_user_created_id', table_name='trips')
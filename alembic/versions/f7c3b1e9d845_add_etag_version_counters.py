@@ -0,0 +1,29 @@
+"""add version counters to destinations, landing_pages and global_settings
+
+Revision ID: f7c3b1e9d845
+Revises: d1e5a3c8f720
+Create Date: 2026-10-18 17:48:13.562907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3b1e9d845'
+down_revision: Union[str, None] = 'd1e5a3c8f720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('destinations', 'landing_pages', 'global_settings')
+
+
+def upgrade():
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, 'version')
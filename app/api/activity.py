@@ -4,23 +4,13 @@ from schemas.activity import ActivityCreate, ActivityOut
 from models.activity import Activity
 from core.database import get_db
 from utils.response import api_json_response_format  # Adjust path if needed
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 
 router = APIRouter()
 
 @router.post("/")
-def create_activity(activity_in: ActivityCreate, db: Session = Depends(get_db),x_api_key: str = Header(None)):
+def create_activity(activity_in: ActivityCreate, db: Session = Depends(get_db),user_id: int = Depends(get_current_user_id)):
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = api_key_entry.user_id
-
         # activity = Activity(**activity_in.model_dump())
         # activity["user_id"] = user_id
         activity_data = activity_in.model_dump()
@@ -36,17 +26,8 @@ def create_activity(activity_in: ActivityCreate, db: Session = Depends(get_db),x
         return api_json_response_format(False, f"Error creating activity: {e}", 500, {})
 
 @router.get("/")
-def get_all_activities(db: Session = Depends(get_db),x_api_key: str = Header(None)):
+def get_all_activities(db: Session = Depends(get_db),user_id: int = Depends(get_current_user_id)):
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = api_key_entry.user_id
         # activities = db.query(Activity).all()
         activities = db.query(Activity).filter(Activity.user_id == user_id).all()
         data = [ActivityOut.model_validate(a).model_dump() for a in activities]
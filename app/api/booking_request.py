@@ -11,7 +11,7 @@ from schemas.booking_request import (
 from core.database import get_db
 from utils.response import api_json_response_format
 from models.user import User
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 from utils.email_utility import send_booking_email
 
 router = APIRouter()
@@ -59,18 +59,11 @@ def create_booking(
 # GET ALL BOOKINGS (non-deleted)
 # ----------------------------------------------------------
 @router.get("/")
-def get_all_bookings(db: Session = Depends(get_db), x_api_key: str = Header(None)):
+def get_all_bookings(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key missing")
-
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API Key")
-
         records = (
             db.query(BookingRequest)
-            .filter(BookingRequest.user_id == api_entry.user_id, BookingRequest.is_deleted == False)
+            .filter(BookingRequest.user_id == user_id, BookingRequest.is_deleted == False)
             .order_by(BookingRequest.created_at.desc())
             .all()
         )
@@ -107,18 +100,14 @@ def update_booking(
     booking_id: int,
     data: BookingRequestUpdate,
     db: Session = Depends(get_db),
-    x_api_key: str = Header(None)
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API Key")
-
         record = (
             db.query(BookingRequest)
             .filter(
                 BookingRequest.id == booking_id,
-                BookingRequest.user_id == api_entry.user_id,
+                BookingRequest.user_id == user_id,
                 BookingRequest.is_deleted == False
             )
             .first()
@@ -147,15 +136,11 @@ def update_booking(
 # SOFT DELETE
 # ----------------------------------------------------------
 @router.delete("/{booking_id}/soft")
-def soft_delete_booking(booking_id: int, db: Session = Depends(get_db), x_api_key: str = Header(None)):
+def soft_delete_booking(booking_id: int, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API Key")
-
         record = db.query(BookingRequest).filter(
             BookingRequest.id == booking_id,
-            BookingRequest.user_id == api_entry.user_id
+            BookingRequest.user_id == user_id
         ).first()
 
         if not record:
@@ -174,15 +159,12 @@ def soft_delete_booking(booking_id: int, db: Session = Depends(get_db), x_api_ke
 # TRASH LIST
 # ----------------------------------------------------------
 @router.get("/trash/list")
-def get_booking_trash(db: Session = Depends(get_db), x_api_key: str = Header(None)):
+def get_booking_trash(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API Key")
-
         trashed = (
             db.query(BookingRequest)
-            .filter(BookingRequest.user_id == api_entry.user_id, BookingRequest.is_deleted == True)
+            .execution_options(include_deleted=True)
+            .filter(BookingRequest.user_id == user_id, BookingRequest.is_deleted == True)
             .order_by(BookingRequest.created_at.desc())
             .all()
         )
@@ -198,15 +180,11 @@ def get_booking_trash(db: Session = Depends(get_db), x_api_key: str = Header(Non
 # HARD DELETE
 # ----------------------------------------------------------
 @router.delete("/{booking_id}/hard")
-def hard_delete_booking(booking_id: int, db: Session = Depends(get_db), x_api_key: str = Header(None)):
+def hard_delete_booking(booking_id: int, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API Key")
-
-        record = db.query(BookingRequest).filter(
+        record = db.query(BookingRequest).execution_options(include_deleted=True).filter(
             BookingRequest.id == booking_id,
-            BookingRequest.user_id == api_entry.user_id
+            BookingRequest.user_id == user_id
         ).first()
 
         if not record:
@@ -8,24 +8,14 @@ from core.database import get_db
 from utils.response import api_json_response_format
 from models.trip import Trip
 from schemas.trip import TripOut
-from crud.trip import serialize_trip
-from models.api_key import APIKey
-from sqlalchemy import or_ # <--- CRITICAL IMPORT: Needed for flexible filtering
+from crud.trip import serialize_trip, trip_graph_options, trips_in_categories
+from core.auth import get_current_user_id
 
 router = APIRouter()
 
 @router.post("/")
-def create_category(category_in: CategoryCreate, db: Session = Depends(get_db),x_api_key: str = Header(None)):
+def create_category(category_in: CategoryCreate, db: Session = Depends(get_db),user_id: int = Depends(get_current_user_id)):
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = int(api_key_entry.user_id)
         payload = category_in.model_dump()
         payload["image"] = json.dumps(payload.get("image", []))  # ✅ convert list to JSON string
         payload["user_id"] = user_id
@@ -60,17 +50,8 @@ def get_category_by_id(category_id: int, db: Session = Depends(get_db)):
         return api_json_response_format(False, f"Error retrieving category: {e}", 500, {})
 
 @router.get("/")
-def get_all_categories(db: Session = Depends(get_db), x_api_key: str = Header(None)):
+def get_all_categories(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = api_key_entry.user_id
         # categories = db.query(Category).all()
         categories = db.query(Category).filter(Category.user_id == user_id).all()
         data = [
@@ -124,21 +105,14 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
 @router.get("/trip_details/{category_id}")
 def get_trip_details(category_id: int, db: Session = Depends(get_db)):
     try:
-        cat_str = str(category_id)
-        
-        # --- CRITICAL FIX APPLIED HERE ---
-        # This uses LIKE with wildcards to correctly find the category ID 
-        # within the comma-separated string, supporting single, start, middle, and end positions.
-        filter_condition = or_(
-            Trip.category_id == cat_str,         # Case 1: Exact match ('5')
-            Trip.category_id.like(f"{cat_str},%"),    # Case 2: Starts with ID ('5,2')
-            Trip.category_id.like(f"%,{cat_str}"),    # Case 3: Ends with ID ('2,5')
-            Trip.category_id.like(f"%,{cat_str},%")   # Case 4: ID is in the middle ('2,5,1')
+        # Indexed trip_categories lookup instead of LIKE scans over the comma-separated column
+        trip_details = (
+            db.query(Trip)
+            .options(*trip_graph_options())
+            .filter(Trip.id.in_(trips_in_categories([category_id])))
+            .all()
         )
         
-        trip_details = db.query(Trip).filter(filter_condition).all()
-        # --- END CRITICAL FIX ---
-        
         data = [serialize_trip(t) for t in trip_details]
         return api_json_response_format(True, "Trip details retrieved successfully.", 200, data)
     except Exception as e:
@@ -1,36 +1,30 @@
 import json
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from crud.trip import serialize_trip
-from fastapi import APIRouter, Depends, HTTPException, Query,Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query,Header, Request
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session, selectinload
 from schemas.destination import DestinationCreate, DestinationOut
 from models.destination import (
     Destination, DestinationTrip, CustomPackage, CustomPackageTrip,
     DestinationBlog, DestinationActivity, DestinationTestimonial, DestinationBlogCategory
 )
 from core.database import get_db
-from utils.response import api_json_response_format
+from utils.response import api_json_response_format, api_json_response, ORJSONResponse
+from utils.etag import make_etag, not_modified, with_etag
+from utils.fields import parse_fields, project, projection_options
 
 from models.trip import Trip
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 
 router = APIRouter()
 
 @router.post("/")
-def create_destination(destination_in: DestinationCreate, db: Session = Depends(get_db),x_api_key: str = Header(None)):
+def create_destination(destination_in: DestinationCreate, db: Session = Depends(get_db),user_id: int = Depends(get_current_user_id)):
     try:
 
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = int(api_key_entry.user_id)
-        
         slug = destination_in.slug or destination_in.title.lower().replace(" ", "-")
 
         destination = Destination(
@@ -124,9 +118,44 @@ def get_trips(trip_ids: List[int] = Query(...), db: Session = Depends(get_db)):
     return trips
 
 
+def get_destination_version(db: Session, destination_id: int):
+    """
+    (version, sum of linked trip versions, linked trip count), or None if the
+    destination does not exist. Popular and custom-package trips are embedded
+    in the response, so their edits count: every trip write bumps its version,
+    so the sum only ever grows while the links stay the same.
+    """
+    linked_trip_ids = union(
+        select(DestinationTrip.trip_id).where(DestinationTrip.destination_id == destination_id),
+        select(CustomPackageTrip.trip_id)
+        .join(CustomPackage, CustomPackage.id == CustomPackageTrip.package_id)
+        .where(CustomPackage.destination_id == destination_id),
+    )
+    trips_version = (
+        select(func.coalesce(func.sum(Trip.version), 0), func.count(Trip.id))
+        .where(Trip.id.in_(linked_trip_ids))
+    )
+    row = db.execute(
+        select(Destination.version).where(Destination.id == destination_id)
+    ).first()
+    if row is None:
+        return None
+    trips_version_sum, trips_count = db.execute(trips_version).one()
+    return (row.version, trips_version_sum, trips_count)
+
+
 @router.get("/{destination_id}")
-def get_destination_by_id(destination_id: int, db: Session = Depends(get_db)):
+def get_destination_by_id(destination_id: int, request: Request, db: Session = Depends(get_db)):
     try:
+        # Version lookup first: a matching If-None-Match never loads the destination graph
+        version = get_destination_version(db, destination_id)
+        if version is None:
+            return api_json_response_format(False, "Destination not found", 404, {})
+        etag = make_etag("destination", destination_id, *version)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
         destination = db.query(Destination).filter(Destination.id == destination_id).first()
         if not destination:
             return api_json_response_format(False, "Destination not found", 404, {})
@@ -175,64 +204,94 @@ def get_destination_by_id(destination_id: int, db: Session = Depends(get_db)):
             "blog_category_ids": [c.category_id for c in destination.blog_categories]
         }
 
-        return api_json_response_format(True, "Destination retrieved successfully.", 200, data)
+        return with_etag(api_json_response(True, "Destination retrieved successfully.", 200, data), etag)
 
     except Exception as e:
         return api_json_response_format(False, f"Error retrieving destination: {e}", 500, {})
 
+# List item field -> value. Scalar field names are Destination column names
+# (see utils.fields.projection_options); the rest come from relationships.
+DESTINATION_LIST_FIELDS = {
+    "id": lambda d, db: d.id,
+    "title": lambda d, db: d.title,
+    "subtitle": lambda d, db: d.subtitle,
+    "destination_type": lambda d, db: d.destination_type,
+    "primary_destination_id": lambda d, db: d.primary_destination_id,
+    "slug": lambda d, db: d.slug,
+    "overview": lambda d, db: d.overview,
+    "travel_guidelines": lambda d, db: d.travel_guidelines,
+    "hero_banner_images": lambda d, db: json.loads(d.hero_banner_images or "[]"),
+
+    "created_at": lambda d, db: d.created_at,
+    "updated_at": lambda d, db: d.updated_at,
+    "popular_trip_ids": lambda d, db: [t.trip_id for t in d.trips],
+    "custom_packages": lambda d, db: [
+        {
+            "title": p.title,
+            "description": p.description,
+            "trip_ids": [ct.trip_id for ct in p.trips]
+        }
+        for p in d.custom_packages
+    ],
+    "featured_blog_ids": lambda d, db: [b.blog_id for b in d.blogs if b.featured],
+    "related_blog_ids": lambda d, db: [b.blog_id for b in d.blogs if not b.featured],
+    "activity_ids": lambda d, db: [a.activity_id for a in d.activities],
+    "testimonial_ids": lambda d, db: [t.testimonial_id for t in d.testimonials],
+    "blog_category_ids": lambda d, db: [c.category_id for c in d.blog_categories],
+}
+
+# Relationship-backed list fields -> loader. Each selectinload is one grouped
+# SELECT ... WHERE <parent id> IN (...) per 500 parents (SQLAlchemy's IN chunk
+# size), so a page of up to 500 destinations is 9 statements (count,
+# destinations, 7 child loads), plus one more per further 500 custom packages
+# on the page for their trips.
+# Built on call, not at import (creating a loader option configures every mapper).
+def destination_list_loaders() -> dict:
+    return {
+        "popular_trip_ids": selectinload(Destination.trips),
+        "custom_packages": selectinload(Destination.custom_packages).selectinload(CustomPackage.trips),
+        "featured_blog_ids": selectinload(Destination.blogs),
+        "related_blog_ids": selectinload(Destination.blogs),
+        "activity_ids": selectinload(Destination.activities),
+        "testimonial_ids": selectinload(Destination.testimonials),
+        "blog_category_ids": selectinload(Destination.blog_categories),
+    }
+
+
+# Largest page: one IN chunk per selectinload
+DESTINATION_PAGE_MAX = 500
+
+
 @router.get("/")
-def get_all_destinations(db: Session = Depends(get_db), x_api_key: str = Header(None)):
+def get_all_destinations(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(DESTINATION_PAGE_MAX, ge=1, le=DESTINATION_PAGE_MAX),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,slug,hero_banner_images."),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
     try:
+        selected = parse_fields(fields, DESTINATION_LIST_FIELDS)
+        query = db.query(Destination).filter(Destination.user_id == user_id)
+        total = query.count()
+        loaders = destination_list_loaders()
+        destinations = (
+            query
+            .options(*projection_options(Destination, selected, loaders, loaders.values()))
+            .order_by(Destination.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+        data = [project(selected, DESTINATION_LIST_FIELDS, destination, db) for destination in destinations]
 
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = api_key_entry.user_id
-        print("DDDDDDDDDDDDDDDDd ",user_id)
-
-        # destinations = db.query(Destination).all()
-        destinations = db.query(Destination).filter(Destination.user_id == user_id).all()
-
-
-        data = []
-        for destination in destinations:
-            item = {
-                "id": destination.id,
-                "title": destination.title,
-                "subtitle": destination.subtitle,
-                "destination_type": destination.destination_type,
-                "primary_destination_id": destination.primary_destination_id,
-                "slug": destination.slug,
-                "overview": destination.overview,
-                "travel_guidelines": destination.travel_guidelines,
-                "hero_banner_images": json.loads(destination.hero_banner_images or "[]"),
-
-                "created_at": destination.created_at,
-                "updated_at": destination.updated_at,
-                "popular_trip_ids": [t.trip_id for t in destination.trips],
-                "custom_packages": [
-                    {
-                        "title": p.title,
-                        "description": p.description,
-                        "trip_ids": [ct.trip_id for ct in db.query(CustomPackageTrip).filter(CustomPackageTrip.package_id == p.id).all()]
-                    }
-                    for p in db.query(CustomPackage).filter(CustomPackage.destination_id == destination.id).all()
-                ],
-                "featured_blog_ids": [b.blog_id for b in destination.blogs if b.featured],
-                "related_blog_ids": [b.blog_id for b in destination.blogs if not b.featured],
-                "activity_ids": [a.activity_id for a in destination.activities],
-                "testimonial_ids": [t.testimonial_id for t in destination.testimonials],
-                "blog_category_ids": [c.category_id for c in destination.blog_categories]
-            }
-            data.append(item)
-
-        return api_json_response_format(True, "Destinations retrieved successfully.", 200, data)
+        body = api_json_response_format(True, "Destinations retrieved successfully.", 200, data)
+        body["total"] = total
+        return ORJSONResponse(body)
 
+    except HTTPException as he:
+        return api_json_response_format(False, he.detail, he.status_code, {})
     except Exception as e:
         return api_json_response_format(False, f"Error retrieving destinations: {e}", 500, {})
 
@@ -253,6 +312,8 @@ def update_destination(destination_id: int, destination_in: DestinationCreate, d
             else:
                 setattr(destination, key, value)
 
+        # Link-table edits below must still UPDATE the destination row, which bumps its version (ETag)
+        destination.updated_at = datetime.now()
 
         # Clear and re-add popular trips
         db.query(DestinationTrip).filter(DestinationTrip.destination_id == destination.id).delete()
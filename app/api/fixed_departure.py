@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 from schemas.fixed_departure import FixedDepartureCreate, FixedDepartureOut
 from models.fixed_departure import FixedDeparture
+from crud.trip_departure import delete_fixed_departure_row, sync_fixed_departure
 from core.database import get_db
 from utils.response import api_json_response_format  # Adjust path if needed
 
@@ -13,6 +14,8 @@ def create_fixed_departure(fd_in: FixedDepartureCreate, db: Session = Depends(ge
     try:
         fd = FixedDeparture(**fd_in.model_dump())
         db.add(fd)
+        db.flush()
+        sync_fixed_departure(db, fd)
         db.commit()
         db.refresh(fd)
         return api_json_response_format(True, "Fixed departure created successfully.", 201, FixedDepartureOut.model_validate(fd).model_dump())
@@ -55,6 +58,7 @@ def update_fixed_departure(fd_id: int, fd_in: FixedDepartureCreate, db: Session
             return api_json_response_format(False, "Fixed departure not found", 404, {})
         for key, value in fd_in.model_dump().items():
             setattr(fd, key, value)
+        sync_fixed_departure(db, fd)
         db.commit()
         db.refresh(fd)
         return api_json_response_format(True, "Fixed departure updated successfully.", 200, FixedDepartureOut.model_validate(fd).model_dump())
@@ -67,6 +71,7 @@ def delete_fixed_departure(fd_id: int, db: Session = Depends(get_db)):
         fd = db.query(FixedDeparture).filter(FixedDeparture.id == fd_id).first()
         if not fd:
             return api_json_response_format(False, "Fixed departure not found", 404, {})
+        delete_fixed_departure_row(db, fd.id)
         db.delete(fd)
         db.commit()
         return api_json_response_format(True, "Fixed departure deleted successfully.", 200, {})
@@ -1,11 +1,11 @@
 # app/api/global_delete.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from core.database import get_db
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 from utils.table_resolver import get_model
 
 router = APIRouter(prefix="/global", tags=["Global Delete"])
@@ -18,17 +18,6 @@ def json_response(success: bool, message: str, data=None):
     return {"success": success, "message": message, "data": data}
 
 
-def validate_api_key(key: str, db: Session):
-    if not key:
-        raise HTTPException(status_code=401, detail="x-api-key missing")
-
-    entry = db.query(APIKey).filter(APIKey.key_value == key).first()
-    if not entry:
-        raise HTTPException(status_code=401, detail="Invalid API key")
-
-    return entry.user_id
-
-
 # --------------------------------------------------------------------
 # EXPAND QUOTATION (FULL STRUCTURE)
 # --------------------------------------------------------------------
@@ -114,11 +103,9 @@ def expand_quotation(db: Session, quotation_id: int):
 def soft_delete(
     table: str = Query(...),
     id: int = Query(...),
-    x_api_key: str = Header(None),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    validate_api_key(x_api_key, db)
-
     # normalize and validate table
     table = table.lower()
     try:
@@ -144,11 +131,9 @@ def soft_delete(
 def restore(
     table: str = Query(...),
     id: int = Query(...),
-    x_api_key: str = Header(None),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    validate_api_key(x_api_key, db)
-
     table = table.lower()
     try:
         get_model(table)
@@ -173,11 +158,9 @@ def restore(
 def hard_delete(
     table: str = Query(...),
     id: int = Query(...),
-    x_api_key: str = Header(None),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    validate_api_key(x_api_key, db)
-
     table = table.lower()
     try:
         get_model(table)
@@ -201,11 +184,9 @@ def hard_delete(
 @router.get("/trash")
 def trash(
     table: str = Query(...),
-    x_api_key: str = Header(None),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    validate_api_key(x_api_key, db)
-
     table = table.lower()
     try:
         get_model(table)
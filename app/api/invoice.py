@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from schemas.invoice import InvoiceCreate
 from models.invoice import Invoice, InvoiceItem, InvoicePayment
 from core.database import get_db
-from utils.response import api_json_response_format
+from utils.response import api_json_response_format, api_json_response
 from datetime import date
 
 router = APIRouter()
@@ -111,7 +111,7 @@ def get_all_invoices(db: Session = Depends(get_db)):
             }
             for inv in invoices
         ]
-        return api_json_response_format(True, "Invoices retrieved successfully.", 200, data)
+        return api_json_response(True, "Invoices retrieved successfully.", 200, data)
     except Exception as e:
         return api_json_response_format(False, f"Error retrieving invoices: {e}", 500, {})
     
@@ -173,7 +173,7 @@ def get_invoice_by_id(invoice_id: int, db: Session = Depends(get_db)):
             ]
         }
 
-        return api_json_response_format(True, "Invoice retrieved successfully.", 200, data)
+        return api_json_response(True, "Invoice retrieved successfully.", 200, data)
 
     except Exception as e:
         return api_json_response_format(False, f"Error retrieving invoice: {e}", 500, {})
@@ -6,6 +6,9 @@ import traceback
 import logging
 
 from core.database import get_db
+from utils.response import ORJSONResponse
+from utils.etag import make_etag, not_modified, with_etag
+from utils.fields import parse_fields, project, projection_options
 from models.landing_page import LandingPage
 from schemas.landing_page import (
     LandingPageCreate,
@@ -38,39 +41,49 @@ def convert_to_dict(value):
     return value.dict() if hasattr(value, 'dict') else value
 
 
-def sanitize_landing_page(page):
+# Scalar fields (name == LandingPage column, see utils.fields.projection_options)
+LANDING_PAGE_BASE_FIELDS = {
+    'id': lambda page: page.id,
+    'page_name': lambda page: page.page_name or '',
+    'slug': lambda page: page.slug or '',
+    'template': lambda page: page.template or 'template-one',
+    'is_active': lambda page: bool(page.is_active),
+    'user_id': lambda page: page.user_id,
+    'domain_name': lambda page: page.domain_name or 'default',
+    'views': lambda page: page.views or 0,
+    'leads': lambda page: page.leads or 0,
+    'created_at': lambda page: page.created_at,
+    'updated_at': lambda page: page.updated_at,
+}
+
+# Section JSON columns
+LANDING_PAGE_JSON_FIELDS = [
+    'custom_scripts', 'theme_colors', 'company', 'company_about', 
+    'live_notifications', 'footer', 'seo', 'hero', 'packages', 
+    'why_choose_us', 'attractions', 'gallery', 'testimonials', 
+    'faqs', 'travel_guidelines', 'custom_sections', 'offers', 
+    'section_order'
+]
+
+LANDING_PAGE_FIELDS = [*LANDING_PAGE_BASE_FIELDS, *LANDING_PAGE_JSON_FIELDS]
+
+
+def sanitize_landing_page(page, fields=None):
     """
     Sanitize landing page data to ensure all fields are properly typed
     Prevents serialization errors
+    `fields` (from utils.fields.parse_fields) limits the output to those keys
     """
     if not page:
         return page
     
     # Convert SQLAlchemy object to dict
-    data = {
-        'id': page.id,
-        'page_name': page.page_name or '',
-        'slug': page.slug or '',
-        'template': page.template or 'template-one',
-        'is_active': bool(page.is_active),
-        'user_id': page.user_id,
-        'domain_name': page.domain_name or 'default',
-        'views': page.views or 0,
-        'leads': page.leads or 0,
-        'created_at': page.created_at,
-        'updated_at': page.updated_at,
-    }
+    data = project(fields, LANDING_PAGE_BASE_FIELDS, page)
     
     # Add JSON fields with defaults if they're None or malformed
-    json_fields = [
-        'custom_scripts', 'theme_colors', 'company', 'company_about', 
-        'live_notifications', 'footer', 'seo', 'hero', 'packages', 
-        'why_choose_us', 'attractions', 'gallery', 'testimonials', 
-        'faqs', 'travel_guidelines', 'custom_sections', 'offers', 
-        'section_order'
-    ]
-    
-    for field in json_fields:
+    for field in LANDING_PAGE_JSON_FIELDS:
+        if fields is not None and field not in fields:
+            continue
         try:
             value = getattr(page, field, None)
             # Ensure it's a dict or None
@@ -95,13 +108,15 @@ def get_all_landing_pages(
     per_page: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. page_name,slug,hero"),
     db: Session = Depends(get_db)
 ):
     """Get all landing pages with pagination"""
     try:
         user_id, domain_name = get_user_id_and_domain(request)
+        selected = parse_fields(fields, LANDING_PAGE_FIELDS)
         
-        query = db.query(LandingPage).filter(
+        query = db.query(LandingPage).options(*projection_options(LandingPage, selected, {})).filter(
             LandingPage.user_id == user_id,
             LandingPage.is_deleted == False
         )
@@ -116,16 +131,16 @@ def get_all_landing_pages(
         offset = (page - 1) * per_page
         pages = query.order_by(LandingPage.created_at.desc()).offset(offset).limit(per_page).all()
         
-        sanitized_pages = [sanitize_landing_page(p) for p in pages]
+        sanitized_pages = [sanitize_landing_page(p, selected) for p in pages]
         total_pages = math.ceil(total / per_page) if total > 0 else 1
         
-        return {
+        return ORJSONResponse({
             "pages": sanitized_pages,
             "total": total,
             "page": page,
             "per_page": per_page,
             "total_pages": total_pages
-        }
+        })
         
     except HTTPException:
         raise
@@ -139,13 +154,15 @@ def get_all_landing_pages_no_pagination(
     request: Request,
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. page_name,slug,hero"),
     db: Session = Depends(get_db)
 ):
     """Get ALL landing pages without pagination"""
     try:
         user_id, domain_name = get_user_id_and_domain(request)
+        selected = parse_fields(fields, LANDING_PAGE_FIELDS)
         
-        query = db.query(LandingPage).filter(
+        query = db.query(LandingPage).options(*projection_options(LandingPage, selected, {})).filter(
             LandingPage.user_id == user_id,
             LandingPage.is_deleted == False
         )
@@ -157,9 +174,9 @@ def get_all_landing_pages_no_pagination(
             query = query.filter(LandingPage.is_active == is_active)
         
         pages = query.order_by(LandingPage.created_at.desc()).all()
-        sanitized_pages = [sanitize_landing_page(p) for p in pages]
+        sanitized_pages = [sanitize_landing_page(p, selected) for p in pages]
         
-        return {"pages": sanitized_pages}
+        return ORJSONResponse({"pages": sanitized_pages})
         
     except HTTPException:
         raise
@@ -187,7 +204,7 @@ def get_landing_page(
         if not landing_page:
             raise HTTPException(status_code=404, detail="Landing page not found")
         
-        return sanitize_landing_page(landing_page)
+        return ORJSONResponse(sanitize_landing_page(landing_page))
         
     except HTTPException:
         raise
@@ -206,21 +223,37 @@ def get_landing_page_by_slug(
     try:
         domain_name = request.headers.get("x-domain-name", "default")
         
-        landing_page = db.query(LandingPage).filter(
+        # Version lookup first: a matching If-None-Match never loads the page sections
+        version = db.query(LandingPage.id, LandingPage.version).filter(
             LandingPage.slug == slug,
             LandingPage.domain_name == domain_name,
             LandingPage.is_active == True,
             LandingPage.is_deleted == False
         ).first()
         
-        if not landing_page:
+        if not version:
             raise HTTPException(status_code=404, detail="Landing page not found")
         
-        # Auto-increment view count
-        landing_page.views += 1
+        # Auto-increment view count. updated_at / version are kept as-is so counting
+        # a view does not change the page's ETag (views/leads are not part of the version).
+        db.query(LandingPage).filter(LandingPage.id == version.id).update(
+            {
+                LandingPage.views: LandingPage.views + 1,
+                LandingPage.updated_at: LandingPage.updated_at,
+                LandingPage.version: LandingPage.version,
+            },
+            synchronize_session=False
+        )
         db.commit()
         
-        return sanitize_landing_page(landing_page)
+        etag = make_etag("landing_page", version.id, version.version)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        
+        landing_page = db.query(LandingPage).filter(LandingPage.id == version.id).first()
+        
+        return with_etag(ORJSONResponse(sanitize_landing_page(landing_page)), etag)
         
     except HTTPException:
         raise
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime, date
-from typing import List
+from typing import List, Optional
 
 from schemas.quotation import QuotationCreate, QuotationOut, QuotationUpdate
 from models.quotation import (
@@ -10,6 +10,8 @@ from models.quotation import (
     QuotationPolicies, QuotationPayment
 )
 from core.database import get_db
+from utils.response import ORJSONResponse
+from utils.fields import parse_fields, project, projection_options
 
 
 def api_json_response_format(success, message, status_code, data):
@@ -131,7 +133,7 @@ def get_quotations_for_lead(lead_id: int, db: Session = Depends(get_db)):
             .all()
         )
         data = [QuotationOut.model_validate(q).model_dump() for q in quotations]
-        return api_json_response_format(True, "Quotations retrieved successfully.", 200, data)
+        return ORJSONResponse(api_json_response_format(True, "Quotations retrieved successfully.", 200, data))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving quotations: {str(e)}")
@@ -140,46 +142,61 @@ def get_quotations_for_lead(lead_id: int, db: Session = Depends(get_db)):
 # ------------------------------------------------------
 # GET ALL QUOTATIONS (SUMMARY LIST)
 # ------------------------------------------------------
+# Summary field -> value. Scalar field names are Quotation column names
+# (see utils.fields.projection_options); agent/company are relationships.
+QUOTATION_LIST_FIELDS = {
+    "id": lambda q: q.id,
+    "lead_id": lambda q: q.lead_id,
+    "design": lambda q: q.design,
+    "status": lambda q: q.status,
+    "amount": lambda q: q.amount,
+    "date": lambda q: q.date.isoformat() if q.date else None,
+    "client_name": lambda q: q.client_name,
+    "client_email": lambda q: q.client_email,
+    "client_mobile": lambda q: q.client_mobile,
+    "hero_image": lambda q: q.hero_image,
+    "gallery_images": lambda q: q.gallery_images.split(",") if q.gallery_images else [],
+
+    "agent": lambda q: {
+        "name": q.agent.name,
+        "email": q.agent.email,
+        "contact": q.agent.contact
+    } if q.agent else None,
+    "company": lambda q: {
+        "name": q.company.name,
+        "email": q.company.email,
+        "mobile": q.company.mobile,
+        "website": q.company.website,
+        "licence": q.company.licence,
+        "logo_url": q.company.logo_url
+    } if q.company else None,
+}
+
+# Built on call, not at import (creating a loader option configures every mapper).
+def quotation_list_loaders() -> dict:
+    return {
+        "agent": selectinload(Quotation.agent),
+        "company": selectinload(Quotation.company),
+    }
+
+
 @router.get("/")
-def get_all_quotations(db: Session = Depends(get_db)):
+def get_all_quotations(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. client_name,status,amount."),
+    db: Session = Depends(get_db)
+):
+    selected = parse_fields(fields, QUOTATION_LIST_FIELDS)
     try:
-        quotations = db.query(Quotation).filter(
+        loaders = quotation_list_loaders()
+        quotations = db.query(Quotation).options(
+            *projection_options(Quotation, selected, loaders, loaders.values())
+        ).filter(
             Quotation.is_deleted == False
         ).order_by(Quotation.date.desc()).all()
 
-        data = []
-
-        for q in quotations:
-            item = {
-                "id": q.id,
-                "lead_id": q.lead_id,
-                "design": q.design,
-                "status": q.status,
-                "amount": q.amount,
-                "date": q.date.isoformat() if q.date else None,
-                "client_name": q.client_name,
-                "client_email": q.client_email,
-                "client_mobile": q.client_mobile,
-                "hero_image": q.hero_image,
-                "gallery_images": q.gallery_images.split(",") if q.gallery_images else [],
-                
-                "agent": {
-                    "name": q.agent.name,
-                    "email": q.agent.email,
-                    "contact": q.agent.contact
-                } if q.agent else None,
-                "company": {
-                    "name": q.company.name,
-                    "email": q.company.email,
-                    "mobile": q.company.mobile,
-                    "website": q.company.website,
-                    "licence": q.company.licence,
-                    "logo_url": q.company.logo_url
-                } if q.company else None,
-            }
-            data.append(item)
+        data = [project(selected, QUOTATION_LIST_FIELDS, q) for q in quotations]
 
-        return api_json_response_format(True, "All quotations retrieved.", 200, data)
+        return ORJSONResponse(api_json_response_format(True, "All quotations retrieved.", 200, data))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving quotations: {str(e)}")
@@ -279,7 +296,7 @@ def get_full_quotation(quotation_id: int, db: Session = Depends(get_db)):
             } if quotation.payment else None
         }
 
-        return api_json_response_format(True, "Full quotation retrieved.", 200, data)
+        return ORJSONResponse(api_json_response_format(True, "Full quotation retrieved.", 200, data))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving quotation: {str(e)}")
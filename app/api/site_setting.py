@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from schemas.site_setting import GlobalSettingsSchema
 from models.site_setting import GlobalSettings
 from core.database import get_db
-from utils.response import api_json_response_format
+from utils.response import api_json_response_format, api_json_response
+from utils.etag import make_etag, not_modified, with_etag
 
 router = APIRouter()
 
@@ -30,11 +31,19 @@ def create_global_settings(payload: GlobalSettingsSchema, db: Session = Depends(
     return api_json_response_format(True, "Global settings created successfully.", 201, {"id": settings.id})
 
 @router.get("/")
-def get_global_settings(db: Session = Depends(get_db)):
-    settings = db.query(GlobalSettings).first()
-    if not settings:
+def get_global_settings(request: Request, db: Session = Depends(get_db)):
+    # Version lookup first: a matching If-None-Match skips the full settings row
+    version = db.query(GlobalSettings.id, GlobalSettings.version).first()
+    if not version:
         return api_json_response_format(False, "Settings not found", 404, {})
 
+    etag = make_etag("global_settings", version.id, version.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    settings = db.query(GlobalSettings).filter(GlobalSettings.id == version.id).first()
+
     def split(val): return val.split(",") if val else []
 
     data = {
@@ -82,7 +91,7 @@ def get_global_settings(db: Session = Depends(get_db)):
         "email_follow_up": settings.email_follow_up
     }
 
-    return api_json_response_format(True, "Global settings retrieved successfully.", 200, data)
+    return with_etag(api_json_response(True, "Global settings retrieved successfully.", 200, data), etag)
 
 
 @router.put("/")
@@ -1,123 +1,324 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Header
+import math
+import os
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Header, Request, Response
 from sqlalchemy.orm import Session
 from core.database import get_db
-from schemas.trip import TripCreate
+from schemas.trip import TripCloneOverrides, TripCreate
 from pydantic import BaseModel
 from typing import List, Optional
 from crud.trip import (
     create_trip,
+    clone_trip,
     get_trips,
-    get_trip_by_id,
+    get_trips_page,
+    search_trips,
+    trip_facet_criteria,
+    trip_price_criteria,
+    get_trip_facets,
+    get_featured_feed,
+    get_related_trips,
+    DURATION_BUCKETS,
+    TRIP_SORTS,
+    TRIP_FIELDS,
+    get_trip_version,
+    get_trip_versions,
+    get_trip_documents,
+    backfill_trip_documents,
     delete_trip,
     serialize_trip,
     update_trip
 )
-from models.api_key import APIKey
+from crud.trip_departure import get_departures_between
+from crud.trip_related import backfill_related_trips, refresh_related_trips_in_background, take_stale_related_trips
+from core.auth import get_current_user_id
+from utils.response import api_json_raw_response, api_json_response, api_json_response_format, ORJSONResponse
+from utils.etag import make_etag, not_modified, with_etag
+from utils.fields import parse_fields
 
 router = APIRouter()
 
-# ✅ Unified response format
-def api_json_response_format(status: bool, message: str, error_code: int, data: any) -> dict:
-    return {
-        "success": status,
-        "message": message,
-        "error_code": error_code,
-        "data": data
-    }
-
 # ✅ List all trips with optional pagination AND category filter
-@router.get("/", response_model=dict)
+# Pass the returned next_cursor back as ?cursor= for the next page (keyset);
+# skip keeps the old OFFSET paging and returns next_cursor = null.
+@router.get("/", response_class=ORJSONResponse)
 def list_trips(
     skip: int = Query(0, ge=0), 
-    limit: int = Query(1000, le=1000),
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page."),
+    sort: str = Query("created_at", description=f"One of: {', '.join(TRIP_SORTS)}."),
     feature_trip_type: Optional[str] = Query(None),
     category_ids: List[int] = Query(None, description="List of category IDs to filter by (OR logic applied)."),
+    themes: List[str] = Query(None, description="List of themes to filter by (OR logic applied)."),
+    price_min: Optional[float] = Query(None, ge=0, description="Lowest starting price (min_price) to include."),
+    price_max: Optional[float] = Query(None, ge=0, description="Highest starting price (min_price) to include."),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,slug,hero_image."),
     db: Session = Depends(get_db), 
-    x_api_key: str = Header(None)
-) -> dict:
+    user_id: int = Depends(get_current_user_id)
+) -> ORJSONResponse:
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
+        if sort not in TRIP_SORTS:
+            return api_json_response(False, f"Unsupported sort '{sort}'", 400, None)
+
+        filters = dict(
+            category_ids=category_ids, feature_trip_type=feature_trip_type, themes=themes, sort=sort,
+            fields=parse_fields(fields, TRIP_FIELDS), criteria=trip_price_criteria(price_min, price_max),
+        )
+        if skip and not cursor:
+            trips, next_cursor = get_trips(db, user_id, skip=skip, limit=limit, **filters), None
+        else:
+            trips, next_cursor = get_trips_page(db, user_id, limit=limit, cursor=cursor, **filters)
+
+        body = api_json_response_format(True, "Trips fetched successfully", 0, trips)
+        body["next_cursor"] = next_cursor
+        return ORJSONResponse(body)
+    except HTTPException as he:
+        return api_json_response(False, he.detail, he.status_code, None)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
+
+# ✅ Ranked full-text search (declared before /{trip_id} so "search" is not taken for an ID)
+@router.get("/search", response_class=ORJSONResponse)
+def search_trips_endpoint(
+    q: str = Query(..., min_length=1, description="Words to search for; each is matched as a prefix."),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,slug,hero_image."),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+) -> ORJSONResponse:
+    try:
+        trips, total = search_trips(db, user_id, q, page=page, per_page=per_page, fields=parse_fields(fields, TRIP_FIELDS))
+        return api_json_response(True, "Trips fetched successfully", 0, {
+            "trips": trips,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": math.ceil(total / per_page) if total > 0 else 1
+        })
+    except HTTPException as he:
+        return api_json_response(False, he.detail, he.status_code, None)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
 
-        # 🔍 Get user_id from api_keys table
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
+# ✅ Filtered trips plus facet counts for the filter sidebar
+@router.get("/facets", response_class=ORJSONResponse)
+def trip_facets_endpoint(
+    limit: int = Query(20, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page."),
+    sort: str = Query("created_at", description=f"One of: {', '.join(TRIP_SORTS)}."),
+    feature_trip_type: Optional[str] = Query(None),
+    category_ids: List[int] = Query(None),
+    themes: List[str] = Query(None),
+    destination_ids: List[int] = Query(None),
+    destination_types: List[str] = Query(None),
+    durations: List[str] = Query(None, description=f"Day buckets: {', '.join(DURATION_BUCKETS)}."),
+    hotel_categories: List[int] = Query(None),
+    price_min: Optional[float] = Query(None, ge=0),
+    price_max: Optional[float] = Query(None, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,slug,hero_image."),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+) -> ORJSONResponse:
+    try:
+        if sort not in TRIP_SORTS:
+            return api_json_response(False, f"Unsupported sort '{sort}'", 400, None)
+
+        criteria = trip_facet_criteria(
+            category_ids=category_ids, themes=themes, destination_ids=destination_ids,
+            destination_types=destination_types, durations=durations, hotel_categories=hotel_categories,
+            price_min=price_min, price_max=price_max,
+        )
+        trips, next_cursor = get_trips_page(
+            db, user_id, limit=limit, cursor=cursor, feature_trip_type=feature_trip_type, sort=sort,
+            fields=parse_fields(fields, TRIP_FIELDS), criteria=tuple(criteria.values()),
+        )
+        facets = get_trip_facets(db, user_id, criteria, feature_trip_type=feature_trip_type)
+
+        body = api_json_response_format(True, "Trips fetched successfully", 0, trips)
+        body["next_cursor"] = next_cursor
+        body["facets"] = facets
+        return ORJSONResponse(body)
+    except HTTPException as he:
+        return api_json_response(False, he.detail, he.status_code, None)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
+
+# ✅ Homepage rail: featured trip cards for one feature_trip_type, served from the per-tenant feed cache
+@router.get("/featured", response_class=ORJSONResponse)
+def featured_trips_endpoint(
+    feature_trip_type: str = Query(..., min_length=1),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+) -> Response:
+    try:
+        feed = get_featured_feed(db, user_id, feature_trip_type)
+        return api_json_raw_response(True, "Trips fetched successfully", 0, feed.cards)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
 
-        user_id = api_key_entry.user_id
-        
-        trips = get_trips(db, user_id, skip=skip, limit=limit, category_ids=category_ids, feature_trip_type=feature_trip_type)   
+# ✅ Trips departing between two dates (inclusive); defaults to the next 30 days
+@router.get("/departures", response_class=ORJSONResponse)
+def trip_departures_endpoint(
+    from_date: Optional[date] = Query(None, description="First departure day (default: today)."),
+    to_date: Optional[date] = Query(None, description="Last departure day (default: from_date + 30 days)."),
+    available_only: bool = Query(True, description="Skip departures with no slots left."),
+    limit: int = Query(200, ge=1, le=1000, description="Maximum number of departures."),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+) -> ORJSONResponse:
+    try:
+        from_date = from_date or date.today()
+        to_date = to_date or from_date + timedelta(days=30)
+        if to_date < from_date:
+            return api_json_response(False, "to_date must not be before from_date", 400, None)
 
-        return api_json_response_format(True, "Trips fetched successfully", 0, trips)
+        trips = get_departures_between(
+            db, user_id,
+            datetime.combine(from_date, time.min),
+            datetime.combine(to_date + timedelta(days=1), time.min),
+            available_only=available_only, limit=limit,
+        )
+        return api_json_response(True, "Departures fetched successfully", 0, trips)
     except Exception as e:
-        return api_json_response_format(False, str(e), 500, None)
+        return api_json_response(False, str(e), 500, None)
 
 # ✅ Get single trip by ID
-@router.get("/{trip_id}", response_model=dict)
-def get_trip_by_id_endpoint(trip_id: int, db: Session = Depends(get_db)) -> dict:
+@router.get("/{trip_id}", response_class=ORJSONResponse)
+def get_trip_by_id_endpoint(trip_id: int, request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> Response:
     try:
-        trip = get_trip_by_id(db, trip_id)
-        if not trip:
-            return api_json_response_format(False, "Trip not found", 404, None)
-        return api_json_response_format(True, "Trip fetched successfully", 0, trip)
+        # Version lookup first: a matching If-None-Match never loads the trip graph
+        version = get_trip_version(db, trip_id)
+        if version is None:
+            return api_json_response(False, "Trip not found", 404, None)
+        etag = make_etag("trip", trip_id, version)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        # Stored document for this version: a key lookup plus a byte copy
+        documents, regenerated = get_trip_documents(db, {trip_id: version})
+        if regenerated:
+            background_tasks.add_task(backfill_trip_documents, db.info.get("user_id"), regenerated)
+        document = documents.get(trip_id)
+        if document is None:
+            return api_json_response(False, "Trip not found", 404, None)
+        return with_etag(api_json_raw_response(True, "Trip fetched successfully", 0, document), etag)
     except Exception as e:
-        return api_json_response_format(False, str(e), 500, None)
+        return api_json_response(False, str(e), 500, None)
+
+# ✅ "You may also like": top-k similar trips of the same tenant
+@router.get("/{trip_id}/related", response_class=ORJSONResponse)
+def related_trips_endpoint(
+    trip_id: int,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(6, ge=1, le=50),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+) -> ORJSONResponse:
+    try:
+        if get_trip_version(db, trip_id) is None:
+            return api_json_response(False, "Trip not found", 404, None)
+        related = get_related_trips(db, user_id, trip_id, limit)
+        if not related:
+            # Possibly a trip saved before trip_related existed: compute it after the response
+            background_tasks.add_task(backfill_related_trips, user_id, trip_id)
+        return api_json_response(True, "Related trips fetched successfully", 0, related)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
+
+def _schedule_related_refresh(db: Session, background_tasks: BackgroundTasks) -> None:
+    """Recompute the related lists a committed trip write left stale, after the response."""
+    for user_id, trip_ids, referencing in take_stale_related_trips(db):
+        background_tasks.add_task(refresh_related_trips_in_background, user_id, trip_ids, referencing)
 
 # ✅ Create new trip
-@router.post("/", response_model=dict)
-def create_trip_endpoint(trip: TripCreate, db: Session = Depends(get_db), x_api_key: str = Header(None)) -> dict:
+@router.post("/", response_class=ORJSONResponse)
+def create_trip_endpoint(trip: TripCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> ORJSONResponse:
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-        
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = int(api_key_entry.user_id)        
         new_trip = create_trip(db, trip, user_id)
+        _schedule_related_refresh(db, background_tasks)
         data = serialize_trip(new_trip)
-        return api_json_response_format(True, "Trip created successfully", 0, data)
+        return api_json_response(True, "Trip created successfully", 0, data)
     except Exception as e:
-        return api_json_response_format(False, str(e), 500, None)
+        return api_json_response(False, str(e), 500, None)
 
 # ✅ Update existing trip
-@router.put("/{trip_id}", response_model=dict)
-def update_trip_endpoint(trip_id: int, trip: TripCreate, db: Session = Depends(get_db)) -> dict:
+@router.put("/{trip_id}", response_class=ORJSONResponse)
+def update_trip_endpoint(trip_id: int, trip: TripCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> ORJSONResponse:
     try:
         updated = update_trip(db, trip_id, trip)
+        _schedule_related_refresh(db, background_tasks)
         if not updated:
-            return api_json_response_format(False, "Trip not found", 404, None)
-        return api_json_response_format(True, "Trip updated successfully", 0, serialize_trip(updated))
+            return api_json_response(False, "Trip not found", 404, None)
+        return api_json_response(True, "Trip updated successfully", 0, serialize_trip(updated))
     except HTTPException as he:
-        return api_json_response_format(False, he.detail, he.status_code, None)
+        return api_json_response(False, he.detail, he.status_code, None)
     except Exception as e:
-        return api_json_response_format(False, str(e), 500, None)
+        return api_json_response(False, str(e), 500, None)
+
+# ✅ Partial update: only the fields present in the body are applied
+@router.patch("/{trip_id}", response_class=ORJSONResponse)
+def patch_trip_endpoint(trip_id: int, trip: TripCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> ORJSONResponse:
+    try:
+        updated = update_trip(db, trip_id, trip, partial=True)
+        _schedule_related_refresh(db, background_tasks)
+        return api_json_response(True, "Trip updated successfully", 0, serialize_trip(updated))
+    except HTTPException as he:
+        return api_json_response(False, he.detail, he.status_code, None)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
+
+# ✅ Clone trip (optional body: fields to change on the copy)
+@router.post("/{trip_id}/clone", response_class=ORJSONResponse)
+def clone_trip_endpoint(trip_id: int, background_tasks: BackgroundTasks, overrides: Optional[TripCloneOverrides] = None, db: Session = Depends(get_db)) -> ORJSONResponse:
+    try:
+        clone = clone_trip(db, trip_id, overrides.dict(exclude_unset=True) if overrides else {})
+        _schedule_related_refresh(db, background_tasks)
+        return api_json_response(True, "Trip cloned successfully", 0, serialize_trip(clone))
+    except HTTPException as he:
+        return api_json_response(False, he.detail, he.status_code, None)
+    except Exception as e:
+        return api_json_response(False, str(e), 500, None)
 
 # ✅ Delete trip
-@router.delete("/{trip_id}", response_model=dict)
-def delete_trip_endpoint(trip_id: int, db: Session = Depends(get_db)) -> dict:
+@router.delete("/{trip_id}", response_class=ORJSONResponse)
+def delete_trip_endpoint(trip_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> ORJSONResponse:
     try:
         result = delete_trip(db, trip_id)
-        return api_json_response_format(True, result["message"], 0, None)
+        _schedule_related_refresh(db, background_tasks)
+        return api_json_response(True, result["message"], 0, None)
     except HTTPException as he:
-        return api_json_response_format(False, he.detail, he.status_code, None)
+        return api_json_response(False, he.detail, he.status_code, None)
     except Exception as e:
-        return api_json_response_format(False, str(e), 500, None)
+        return api_json_response(False, str(e), 500, None)
     
+TRIP_BATCH_MAX_SIZE = int(os.getenv("TRIP_BATCH_MAX_SIZE", 100))
+
 class TripIdList(BaseModel):
     trip_ids: List[int]
 
-@router.post("/batch", response_model=dict)
-def get_multiple_trips(payload: TripIdList, db: Session = Depends(get_db)) -> dict:
+# ✅ Fetch many trips at once: constant query count for any batch size,
+# trips returned in the caller's order (duplicates collapsed), unknown ids in missing_ids
+@router.post("/batch", response_class=ORJSONResponse)
+def get_multiple_trips(payload: TripIdList, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> Response:
     try:
-        trips = []
-        for trip_id in payload.trip_ids:
-            trip = get_trip_by_id(db, trip_id)
-            if trip:
-                trips.append(trip)
+        trip_ids = list(dict.fromkeys(payload.trip_ids))
+        if len(trip_ids) > TRIP_BATCH_MAX_SIZE:
+            return api_json_response(False, f"At most {TRIP_BATCH_MAX_SIZE} trip IDs per batch", 400, None)
+
+        documents, regenerated = get_trip_documents(db, get_trip_versions(db, trip_ids)) if trip_ids else ({}, [])
+        if regenerated:
+            background_tasks.add_task(backfill_trip_documents, db.info.get("user_id"), regenerated)
+        trips = [documents[trip_id] for trip_id in trip_ids if trip_id in documents]
+        missing_ids = [trip_id for trip_id in trip_ids if trip_id not in documents]
         if not trips:
-            return api_json_response_format(False, "No trips found for given IDs", 404, [])
-        return api_json_response_format(True, "Trips fetched successfully", 0, trips)
+            body = api_json_response_format(False, "No trips found for given IDs", 404, [])
+            body["missing_ids"] = missing_ids
+            return ORJSONResponse(body)
+        return api_json_raw_response(
+            True, "Trips fetched successfully", 0, b"[" + b",".join(trips) + b"]",
+            extra={"missing_ids": missing_ids},
+        )
     except Exception as e:
-        return api_json_response_format(False, str(e), 500, None)
\ No newline at end of file
+        return api_json_response(False, str(e), 500, None)
\ No newline at end of file
@@ -7,7 +7,7 @@ from schemas.trip_inquiries import TripInquiryCreate, TripInquiryOut
 from core.database import get_db
 from utils.response import api_json_response_format
 
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 
 router = APIRouter()
 
@@ -39,17 +39,8 @@ def create_trip_inquiry(data: TripInquiryCreate, db: Session = Depends(get_db)):
         return api_json_response_format(False, f"Error submitting trip inquiry: {e}", 500, {})
 
 @router.get("/")
-def get_all_trip_inquiries(db: Session = Depends(get_db),x_api_key: str = Header(None)):
+def get_all_trip_inquiries(db: Session = Depends(get_db),user_id: int = Depends(get_current_user_id)):
     try:
-        if not x_api_key:
-            raise HTTPException(status_code=401, detail="x-api-key header missing")
-        
-        api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_key_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        user_id = int(api_key_entry.user_id) 
-        
         inquiries = db.query(TripInquiry).filter(TripInquiry.user_id == user_id).order_by(TripInquiry.created_at.desc()).all()
         data = [TripInquiryOut.model_validate(i).model_dump() for i in inquiries]
         return api_json_response_format(True, "Trip inquiries retrieved successfully.", 200, data)
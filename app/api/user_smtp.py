@@ -2,21 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.orm import Session
 from core.database import get_db
 from models.user import User
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 from utils.response import api_json_response_format
 
 router = APIRouter()
 
 
-def get_user_from_api_key(db: Session, x_api_key: str):
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="x-api-key missing")
-
-    api_key_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-    if not api_key_entry:
-        raise HTTPException(status_code=401, detail="Invalid API key")
-
-    user = db.query(User).filter(User.id == api_key_entry.user_id).first()
+def get_user_by_id(db: Session, user_id: int):
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -29,10 +22,10 @@ def get_user_from_api_key(db: Session, x_api_key: str):
 @router.get("/smtp")
 def get_smtp_settings(
     db: Session = Depends(get_db),
-    x_api_key: str = Header(None)
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        user = get_user_from_api_key(db, x_api_key)
+        user = get_user_by_id(db, user_id)
 
         data = {
             "smtp_host": user.smtp_host,
@@ -55,10 +48,10 @@ def get_smtp_settings(
 def update_smtp_settings(
     payload: dict,
     db: Session = Depends(get_db),
-    x_api_key: str = Header(None)
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        user = get_user_from_api_key(db, x_api_key)
+        user = get_user_by_id(db, user_id)
 
         user.smtp_host = payload.get("smtp_host")
         user.smtp_port = payload.get("smtp_port")
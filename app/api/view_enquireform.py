@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.model_enquireform import EnquireForm
 from schemas.schema_enquireform import (
@@ -8,31 +9,35 @@ from schemas.schema_enquireform import (
     EnquireFormOut
 )
 
-from core.database import get_db
+from core.database import get_async_db
 from utils.response import api_json_response_format
 from models.user import User
-from models.api_key import APIKey
+from core.auth import get_current_user_id
 from utils.email_utility import send_enquiry_email
 
 router = APIRouter()
 
 
+def send_enquiry_email_safely(enquiry: dict, api_key: str):
+    """Runs after the response, in the threadpool, so SMTP never blocks the event loop."""
+    try:
+        send_enquiry_email(enquiry, api_key)
+    except Exception as e:
+        print("Email failed:", e)
+
+
 # ---------------------------------------------------------------
 # GET ALL (non-deleted)
 # ---------------------------------------------------------------
 @router.get("/")
-async def get_enquiries(db: Session = Depends(get_db), x_api_key: str = Header(None)):
+async def get_enquiries(db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        enquiries = (
-            db.query(EnquireForm)
-            .filter(EnquireForm.user_id == api_entry.user_id, EnquireForm.is_deleted == False)
+        result = await db.execute(
+            select(EnquireForm)
+            .where(EnquireForm.user_id == user_id, EnquireForm.is_deleted == False)
             .order_by(EnquireForm.created_at.desc())
-            .all()
         )
+        enquiries = result.scalars().all()
 
         data = [EnquireFormOut.model_validate(e).model_dump() for e in enquiries]
         return api_json_response_format(True, "Enquiries retrieved.", 200, data)
@@ -45,9 +50,9 @@ async def get_enquiries(db: Session = Depends(get_db), x_api_key: str = Header(N
 # GET ONE
 # ---------------------------------------------------------------
 @router.get("/{enquire_id}")
-async def get_enquiry(enquire_id: int, db: Session = Depends(get_db)):
+async def get_enquiry(enquire_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        enquiry = db.query(EnquireForm).filter(EnquireForm.id == enquire_id).first()
+        enquiry = await db.scalar(select(EnquireForm).where(EnquireForm.id == enquire_id))
         if not enquiry or enquiry.is_deleted:
             return api_json_response_format(False, "Enquiry not found", 404, {})
 
@@ -65,10 +70,11 @@ async def get_enquiry(enquire_id: int, db: Session = Depends(get_db)):
 async def create_enquiry(
     data: EnquireFormCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        user = db.query(User).filter(User.website == data.domain_name).first()
+        user = await db.scalar(select(User).where(User.website == data.domain_name))
         if not user:
             return api_json_response_format(False, "Invalid domain name – user not found.", 404, {})
 
@@ -76,19 +82,16 @@ async def create_enquiry(
         record = EnquireForm(user_id=user.id, **payload)
 
         db.add(record)
-        db.flush()
+        await db.flush()
         record.enquiry_id = record.id
 
-        db.commit()
-        db.refresh(record)
+        await db.commit()
+        await db.refresh(record)
 
         response_data = EnquireFormOut.model_validate(record).model_dump()
 
         x_api_key = request.headers.get("x-api-key")
-        try:
-            send_enquiry_email(response_data, x_api_key)
-        except Exception as e:
-            print("Email failed:", e)
+        background_tasks.add_task(send_enquiry_email_safely, response_data, x_api_key)
 
         return api_json_response_format(True, "Enquiry created successfully.", 201, response_data)
 
@@ -103,22 +106,17 @@ async def create_enquiry(
 async def update_enquiry(
     enquire_id: int,
     data: EnquireFormUpdate,
-    db: Session = Depends(get_db),
-    x_api_key: str = Header(None)
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        record = (
-            db.query(EnquireForm)
-            .filter(
+        record = await db.scalar(
+            select(EnquireForm)
+            .where(
                 EnquireForm.id == enquire_id,
-                EnquireForm.user_id == api_entry.user_id,
+                EnquireForm.user_id == user_id,
                 EnquireForm.is_deleted == False
             )
-            .first()
         )
 
         if not record:
@@ -129,15 +127,15 @@ async def update_enquiry(
         for key, value in update_data.items():
             setattr(record, key, value)
 
-        db.commit()
-        db.refresh(record)
+        await db.commit()
+        await db.refresh(record)
 
         response_data = EnquireFormOut.model_validate(record).model_dump()
 
         return api_json_response_format(True, "Enquiry updated successfully.", 200, response_data)
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return api_json_response_format(False, f"Error updating enquiry: {e}", 500, {})
 
 
@@ -145,22 +143,20 @@ async def update_enquiry(
 # SOFT DELETE
 # ---------------------------------------------------------------
 @router.delete("/{enquire_id}/soft")
-async def soft_delete_enquiry(enquire_id: int, db: Session = Depends(get_db), x_api_key: str = Header(None)):
+async def soft_delete_enquiry(enquire_id: int, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        record = db.query(EnquireForm).filter(
-            EnquireForm.id == enquire_id,
-            EnquireForm.user_id == api_entry.user_id
-        ).first()
+        record = await db.scalar(
+            select(EnquireForm).where(
+                EnquireForm.id == enquire_id,
+                EnquireForm.user_id == user_id
+            )
+        )
 
         if not record:
             return api_json_response_format(False, "Enquiry not found", 404, {})
 
         record.is_deleted = True
-        db.commit()
+        await db.commit()
 
         return api_json_response_format(True, "Enquiry moved to trash.", 200, {})
 
@@ -172,18 +168,15 @@ async def soft_delete_enquiry(enquire_id: int, db: Session = Depends(get_db), x_
 # TRASH LIST
 # ---------------------------------------------------------------
 @router.get("/trash/list")
-async def get_enquiry_trash(db: Session = Depends(get_db), x_api_key: str = Header(None)):
+async def get_enquiry_trash(db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        trashed = (
-            db.query(EnquireForm)
-            .filter(EnquireForm.user_id == api_entry.user_id, EnquireForm.is_deleted == True)
+        result = await db.execute(
+            select(EnquireForm)
+            .execution_options(include_deleted=True)
+            .where(EnquireForm.user_id == user_id, EnquireForm.is_deleted == True)
             .order_by(EnquireForm.created_at.desc())
-            .all()
         )
+        trashed = result.scalars().all()
 
         data = [EnquireFormOut.model_validate(e).model_dump() for e in trashed]
         return api_json_response_format(True, "Trash retrieved.", 200, data)
@@ -196,27 +189,25 @@ async def get_enquiry_trash(db: Session = Depends(get_db), x_api_key: str = Head
 # HARD DELETE
 # ---------------------------------------------------------------
 @router.delete("/{enquire_id}/hard")
-async def hard_delete_enquiry(enquire_id: int, db: Session = Depends(get_db), x_api_key: str = Header(None)):
+async def hard_delete_enquiry(enquire_id: int, db: AsyncSession = Depends(get_async_db), user_id: int = Depends(get_current_user_id)):
     try:
-        api_entry = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-        if not api_entry:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-
-        record = db.query(EnquireForm).filter(
-            EnquireForm.id == enquire_id,
-            EnquireForm.user_id == api_entry.user_id
-        ).first()
+        record = await db.scalar(
+            select(EnquireForm).execution_options(include_deleted=True).where(
+                EnquireForm.id == enquire_id,
+                EnquireForm.user_id == user_id
+            )
+        )
 
         if not record:
             return api_json_response_format(False, "Enquiry not found", 404, {})
 
-        db.delete(record)
-        db.commit()
+        await db.delete(record)
+        await db.commit()
 
         return api_json_response_format(True, "Enquiry permanently deleted.", 200, {})
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         return api_json_response_format(False, f"Error deleting enquiry: {e}", 500, {})
 
 
@@ -0,0 +1,191 @@
+# app/core/api_key_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+
+from core.database import SessionLocal
+from models.api_key import APIKey
+from models.user import User
+
+# --- Cache Configuration ---
+# Staleness bounds for a revoked / deactivated / deleted key:
+#   - the worker that wrote the change through the ORM drops it at once
+#     (after_update / after_delete below)
+#   - every other worker, and any change made by a bulk or Core UPDATE/DELETE
+#     or outside the app, is caught by the next revalidation sweep, i.e.
+#     within API_KEY_CACHE_REVALIDATE_INTERVAL seconds
+#   - with the sweep disabled (interval <= 0) an entry lives up to
+#     API_KEY_CACHE_TTL seconds, so keep the TTL short
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", 30))
+API_KEY_CACHE_MAX_SIZE = int(os.getenv("API_KEY_CACHE_MAX_SIZE", 10000))
+API_KEY_CACHE_REVALIDATE_INTERVAL = float(os.getenv("API_KEY_CACHE_REVALIDATE_INTERVAL", 5))
+API_KEY_REVALIDATE_CHUNK = 500
+
+
+class APIKeyIdentity(NamedTuple):
+    user_id: int
+    tenant_id: int
+    is_active: bool
+    role: Optional[str] = None
+
+
+# ---------------------------
+# 🚀 Bounded TTL Cache
+# ---------------------------
+class APIKeyCache:
+    """
+    In-process LRU cache: key_value -> APIKeyIdentity.
+      - Entries expire after `ttl` seconds
+      - Oldest entries are evicted once `max_size` is reached
+      - Only existing keys are cached, so a newly issued key is never shadowed
+      - Every `revalidate_interval` seconds the cached keys are re-read in
+        bulk and entries whose row changed or disappeared are dropped
+    """
+    def __init__(
+        self,
+        ttl: float = API_KEY_CACHE_TTL,
+        max_size: int = API_KEY_CACHE_MAX_SIZE,
+        revalidate_interval: float = API_KEY_CACHE_REVALIDATE_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.revalidate_interval = revalidate_interval
+        self._entries: "OrderedDict[str, tuple[float, APIKeyIdentity]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._revalidating = threading.Lock()
+        self._next_revalidation = time.monotonic() + revalidate_interval
+
+    def get(self, key_value: str) -> Optional[APIKeyIdentity]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key_value)
+            if entry is None:
+                return None
+
+            expires_at, identity = entry
+            if expires_at <= now:
+                del self._entries[key_value]
+                return None
+
+            self._entries.move_to_end(key_value)
+            return identity
+
+    def put(self, key_value: str, identity: APIKeyIdentity) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key_value] = (time.monotonic() + self.ttl, identity)
+            self._entries.move_to_end(key_value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key_value: str) -> None:
+        with self._lock:
+            self._entries.pop(key_value, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def revalidation_due(self) -> bool:
+        return self.revalidate_interval > 0 and time.monotonic() >= self._next_revalidation
+
+    def revalidate(self, load: Callable[[List[str]], Dict[str, APIKeyIdentity]]) -> None:
+        """
+        Drop every entry whose current identity, as returned by `load` for the
+        cached key values, differs or is missing. One caller sweeps at a time;
+        concurrent callers go on with the current entries.
+        """
+        if not self._revalidating.acquire(blocking=False):
+            return
+        try:
+            self._next_revalidation = time.monotonic() + self.revalidate_interval
+            with self._lock:
+                checked = list(self._entries)
+            if not checked:
+                return
+
+            current = load(checked)
+            with self._lock:
+                for key_value in checked:
+                    entry = self._entries.get(key_value)
+                    if entry is not None and current.get(key_value) != entry[1]:
+                        del self._entries[key_value]
+        finally:
+            self._revalidating.release()
+
+
+api_key_cache = APIKeyCache()
+
+
+def _load_identities(key_values: List[str], pinned_to_primary: bool = False) -> Dict[str, APIKeyIdentity]:
+    """key_value -> current identity for the given values; unknown values are absent."""
+    identities: Dict[str, APIKeyIdentity] = {}
+    db = SessionLocal()
+    db.info["pinned_to_primary"] = pinned_to_primary
+    try:
+        for start in range(0, len(key_values), API_KEY_REVALIDATE_CHUNK):
+            rows = (
+                db.query(APIKey.key_value, APIKey.user_id, APIKey.tenant_id, APIKey.is_active, User.role)
+                .outerjoin(User, User.id == APIKey.user_id)
+                .filter(APIKey.key_value.in_(key_values[start:start + API_KEY_REVALIDATE_CHUNK]))
+                .all()
+            )
+            for row in rows:
+                identities[row.key_value] = APIKeyIdentity(
+                    user_id=int(row.user_id),
+                    tenant_id=int(row.tenant_id),
+                    is_active=bool(row.is_active),
+                    role=row.role.value if row.role is not None else None,
+                )
+    finally:
+        db.close()
+    return identities
+
+
+def _revalidate_from_primary(key_values: List[str]) -> Dict[str, APIKeyIdentity]:
+    # A lagging replica would hand back the identity the sweep is meant to drop
+    return _load_identities(key_values, pinned_to_primary=True)
+
+
+def resolve_api_key(key_value: str) -> Optional[APIKeyIdentity]:
+    """
+    Return the identity behind an x-api-key value.
+    A warm key is answered from memory; a miss costs one SELECT. Once per
+    revalidation interval the caller also re-reads every cached key.
+    """
+    if not key_value:
+        return None
+
+    if api_key_cache.revalidation_due():
+        api_key_cache.revalidate(_revalidate_from_primary)
+
+    identity = api_key_cache.get(key_value)
+    if identity is not None:
+        return identity
+
+    identity = _load_identities([key_value]).get(key_value)
+    if identity is None:
+        return None
+
+    api_key_cache.put(key_value, identity)
+    return identity
+
+
+# ---------------------------
+# Invalidation on revoke / deactivate / delete
+# ---------------------------
+@event.listens_for(APIKey, "after_update")
+@event.listens_for(APIKey, "after_delete")
+def _invalidate_api_key(mapper, connection, target):
+    api_key_cache.invalidate(target.key_value)
+
+    # A rotated key_value must not keep resolving under its old value
+    for old_value in inspect(target).attrs.key_value.history.deleted or ():
+        api_key_cache.invalidate(old_value)
@@ -1,17 +1,63 @@
-from fastapi import Header, HTTPException, Depends
-from sqlalchemy.orm import Session
-from core.database import get_db
-from models.api_key import APIKey
-
-def get_current_user_id(
-    x_api_key: str = Header(None),
-    db: Session = Depends(get_db)
-):
-    if not x_api_key:
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
+
+from core.api_key_cache import APIKeyIdentity, resolve_api_key
+
+
+# ---------------------------
+# 🚀 Request Principal
+# ---------------------------
+@dataclass(frozen=True)
+class Principal:
+    """
+    Who is calling: resolved once per request from x-api-key and shared by
+    the tenant middleware, verify_api_key and every handler dependency.
+    """
+    api_key: Optional[str] = None
+    user_id: Optional[int] = None
+    tenant_id: Optional[int] = None
+    role: Optional[str] = None
+    is_active: bool = False
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.user_id is not None
+
+
+def resolve_principal(x_api_key: Optional[str]) -> Principal:
+    identity = resolve_api_key(x_api_key) if x_api_key else None
+    return principal_from_identity(x_api_key, identity)
+
+
+def principal_from_identity(x_api_key: Optional[str], identity: Optional[APIKeyIdentity]) -> Principal:
+    if identity is None:
+        return Principal(api_key=x_api_key)
+
+    return Principal(
+        api_key=x_api_key,
+        user_id=identity.user_id,
+        tenant_id=identity.tenant_id,
+        role=identity.role,
+        is_active=identity.is_active,
+    )
+
+
+def get_principal(request: Request) -> Principal:
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        # Sub-app called without the gateway middleware (tests, scripts)
+        principal = resolve_principal(request.headers.get("x-api-key"))
+        request.state.principal = principal
+    return principal
+
+
+def get_current_user_id(principal: Principal = Depends(get_principal)) -> int:
+    if not principal.api_key:
         raise HTTPException(status_code=401, detail="x-api-key header missing")
 
-    api_key_row = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-    if not api_key_row:
+    if not principal.is_authenticated:
         raise HTTPException(status_code=401, detail="Invalid x-api-key")
 
-    return api_key_row.user_id
+    return principal.user_id
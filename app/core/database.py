@@ -1,46 +1,91 @@
 # app/core/database.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session as _Session, declarative_base
+from sqlalchemy import and_, bindparam, create_engine, event, true
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import sessionmaker, Session as _Session, declarative_base, with_loader_criteria
 from fastapi import Request
 from contextvars import ContextVar
+from urllib.parse import quote_plus
+from dotenv import load_dotenv
 import pymysql
+import random
 import os
 
+from core.pool import pool_engine_kwargs, install_idle_pre_ping
+
 pymysql.install_as_MySQLdb()
+load_dotenv()
 
-# --- Database Configuration (same as your current logic) ---
-DB_USER = "root"
-DB_PASS = "examplepassword"
-DB_PORT = "3306"
-DB_NAME = "travelcrm"
+# --- Database Configuration (env, with the previous values as defaults) ---
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASS = os.getenv("DB_PASS", "examplepassword")
+DB_PORT = os.getenv("DB_PORT", "3306")
+DB_NAME = os.getenv("DB_NAME", "travelcrm")
 
 try:
     # Detect Docker
     is_docker = os.path.exists('/.dockerenv')
 
-    if is_docker:
-        DB_HOST = "db"
-    else:
-        DB_HOST = "72.60.202.179"
+    DB_HOST = os.getenv("DB_HOST") or ("db" if is_docker else "72.60.202.179")
 
-    DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    DATABASE_URL = f"mysql+pymysql://{DB_USER}:{quote_plus(DB_PASS)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL is missing or empty")
 
     engine = create_engine(
         DATABASE_URL,
-        pool_pre_ping=True,
+        **pool_engine_kwargs(),
         connect_args={
             'connect_timeout': 10,
             "get_server_public_key": True}
     )
+    install_idle_pre_ping(engine)
 
 except Exception as e:
     print(f"❌ Failed to initialize database engine: {e}")
     engine = None
 
+try:
+    # Same server, asyncio driver (aiomysql)
+    ASYNC_DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{quote_plus(DB_PASS)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        **pool_engine_kwargs(async_engine=True),
+        connect_args={'connect_timeout': 10}
+    )
+
+except Exception as e:
+    print(f"❌ Failed to initialize async database engine: {e}")
+    async_engine = None
+
+# --- Read replicas: DB_REPLICA_HOSTS="host1,host2:3307" (same credentials) ---
+replica_engines = []
+async_replica_engines = []
+
+for replica in filter(None, (h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(","))):
+    replica_host, _, replica_port = replica.partition(":")
+    replica_port = replica_port or DB_PORT
+    try:
+        replica_engine = create_engine(
+            f"mysql+pymysql://{DB_USER}:{quote_plus(DB_PASS)}@{replica_host}:{replica_port}/{DB_NAME}",
+            **pool_engine_kwargs(),
+            connect_args={
+                'connect_timeout': 10,
+                "get_server_public_key": True}
+        )
+        install_idle_pre_ping(replica_engine)
+        replica_engines.append(replica_engine)
+
+        async_replica_engines.append(create_async_engine(
+            f"mysql+aiomysql://{DB_USER}:{quote_plus(DB_PASS)}@{replica_host}:{replica_port}/{DB_NAME}",
+            **pool_engine_kwargs(async_engine=True),
+            connect_args={'connect_timeout': 10}
+        ))
+    except Exception as e:
+        print(f"❌ Failed to initialize replica engine {replica}: {e}")
+
 Base = declarative_base()
 
 # Store tenant user_id for current request
@@ -54,8 +99,39 @@ class TenantSession(_Session):
     """
     Custom SQLAlchemy Session that:
       - Auto-fills instance.user_id on add()
-      - Auto-filters queries by user_id for single-model queries
+      - Auto-filters ORM statements by user_id and is_deleted (see below)
+      - Sends plain reads to a replica when DB_REPLICA_HOSTS is set
     """
+    # Engines that may serve plain SELECTs; empty means everything uses the primary
+    replica_binds = replica_engines
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        """
+        Route plain SELECTs to a replica and everything else to the primary.
+        Once this session has flushed or written, it stays on the primary so
+        the rest of the request reads its own writes; get_db pins sessions of
+        write requests before their first read.
+        """
+        primary = super().get_bind(mapper, clause=clause, **kw)
+
+        if not self.replica_binds or self.info.get("pinned_to_primary"):
+            return primary
+
+        is_plain_select = (
+            clause is not None
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        )
+        if self._flushing or not is_plain_select:
+            self.info["pinned_to_primary"] = True
+            return primary
+
+        # One replica per session, so a request does not spread over connections
+        replica = self.info.get("replica_bind")
+        if replica is None:
+            replica = self.info["replica_bind"] = random.choice(self.replica_binds)
+        return replica
+
     def add(self, instance, _warn=True):
         try:
             uid = self.info.get("user_id")
@@ -72,26 +148,86 @@ class TenantSession(_Session):
 
         return super().add(instance, _warn=_warn)
 
-    def query(self, *entities, **kwargs):
-        q = super().query(*entities, **kwargs)
 
-        try:
-            if len(entities) == 1:
-                try:
-                    model_class = q._entity_zero().class_
-                except Exception:
-                    model_class = None
+# ---------------------------
+# 🚀 Tenant + Soft-Delete Criteria
+# ---------------------------
+# One with_loader_criteria on Base covers every mapped class, so the hook does
+# not walk the statement's mappers. The lambda runs per class when a statement
+# is compiled (not per execution); the tenant part compares user_id with one
+# bound parameter whose value is read at execution time from the context
+# variable the hook sets right before, so the compiled statement stays cached
+# across tenants.
+_criteria_user_id: ContextVar[int | None] = ContextVar("_criteria_user_id", default=None)
+_tenant_user_id = bindparam("tenant_user_id", callable_=_criteria_user_id.get)
 
-                if model_class is not None and hasattr(model_class, "user_id"):
-                    uid = self.info.get("user_id") or current_request_user_id.get(None)
 
-                    if uid is not None:
-                        q = q.filter(model_class.user_id == uid)
+def _entity_criteria(cls, tenant: bool, soft_delete: bool):
+    # is_deleted is patched onto every model by add_is_deleted_to_all_models()
+    criteria = []
+    if tenant and hasattr(cls, "user_id"):
+        criteria.append(cls.user_id == _tenant_user_id)
+    if soft_delete and hasattr(cls, "is_deleted"):
+        criteria.append(cls.is_deleted == 0)
+    return and_(true(), *criteria)
 
-        except Exception:
-            pass
 
-        return q
+# (tenant?, soft delete?) -> option; no criteria at all when both are off
+_criteria_options = {
+    (True, True): with_loader_criteria(
+        Base, lambda cls: _entity_criteria(cls, True, True),
+        include_aliases=True, track_closure_variables=False,
+    ),
+    (True, False): with_loader_criteria(
+        Base, lambda cls: _entity_criteria(cls, True, False),
+        include_aliases=True, track_closure_variables=False,
+    ),
+    (False, True): with_loader_criteria(
+        Base, lambda cls: _entity_criteria(cls, False, True),
+        include_aliases=True, track_closure_variables=False,
+    ),
+}
+
+
+@event.listens_for(TenantSession, "do_orm_execute")
+def _apply_tenant_and_soft_delete_criteria(execute_state):
+    """
+    Adds `user_id = <tenant>` and `is_deleted = 0` to every ORM SELECT, UPDATE
+    and DELETE - Query, select() and relationship loads alike.
+    Opt out of the soft-delete part with .execution_options(include_deleted=True).
+    """
+    if execute_state.is_column_load:
+        return
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+
+    uid = execute_state.session.info.get("user_id") or current_request_user_id.get(None)
+    soft_delete = not execute_state.execution_options.get("include_deleted", False)
+
+    option = _criteria_options.get((uid is not None, soft_delete))
+    if option is not None:
+        _criteria_user_id.set(uid)
+        execute_state.statement = execute_state.statement.options(option)
+
+
+# ---------------------------
+# 🚀 AsyncTenantSession
+# ---------------------------
+class _AsyncTenantSyncSession(TenantSession):
+    """
+    Sync half of AsyncTenantSession: inherits add(), replica routing and the
+    tenant / soft-delete criteria hook from TenantSession.
+    """
+    replica_binds = [e.sync_engine for e in async_replica_engines]
+
+
+class AsyncTenantSession(AsyncSession):
+    """
+    asyncio counterpart of TenantSession:
+      - Auto-fills instance.user_id on add()
+      - Auto-filters select() statements by user_id and is_deleted
+    """
+    sync_session_class = _AsyncTenantSyncSession
 
 
 # ---------------------------
@@ -104,10 +240,23 @@ SessionLocal = sessionmaker(
     class_=TenantSession
 )
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncTenantSession,
+    autoflush=False,
+    expire_on_commit=False
+) if async_engine is not None else None
+
 
 # ---------------------------
 # 🚀 Main DB Dependency
 # ---------------------------
+# Requests that may only read. Any other method reads what it is about to
+# write (rows to diff, slug collisions, clone sources), so its session uses
+# the primary from the first statement instead of a lagging replica.
+SAFE_METHODS = ("GET", "HEAD")
+
+
 def get_db(request: Request):
     if SessionLocal is None:
         raise RuntimeError("Database session is not initialized")
@@ -117,6 +266,8 @@ def get_db(request: Request):
         uid = getattr(request.state, "user_id", None)
 
         db.info["user_id"] = uid
+        if request.method not in SAFE_METHODS:
+            db.info["pinned_to_primary"] = True
         current_request_user_id.set(uid)
 
         yield db
@@ -124,3 +275,25 @@ def get_db(request: Request):
     finally:
         current_request_user_id.set(None)
         db.close()
+
+
+# ---------------------------
+# 🚀 Async DB Dependency
+# ---------------------------
+async def get_async_db(request: Request):
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database session is not initialized")
+
+    async with AsyncSessionLocal() as db:
+        try:
+            uid = getattr(request.state, "user_id", None)
+
+            db.info["user_id"] = uid
+            if request.method not in SAFE_METHODS:
+                db.info["pinned_to_primary"] = True
+            current_request_user_id.set(uid)
+
+            yield db
+
+        finally:
+            current_request_user_id.set(None)
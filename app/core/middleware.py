@@ -0,0 +1,49 @@
+# app/core/middleware.py
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.api_key_cache import api_key_cache, resolve_api_key
+from core.auth import principal_from_identity
+
+
+# ---------------------------
+# 🚀 Tenant Middleware (pure ASGI)
+# ---------------------------
+class TenantMiddleware:
+    """
+    x-api-key → request.state.principal / request.state.user_id
+
+    Plain ASGI instead of @app.middleware("http"): no extra task or body
+    stream per request. A warm key is resolved from the in-process cache on
+    the event loop; only a cache miss, or a due revalidation sweep, goes to the
+    threadpool for the SELECT.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        x_api_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                x_api_key = value.decode("latin-1")
+                break
+
+        identity = None
+        if x_api_key:
+            identity = api_key_cache.get(x_api_key)
+            # Misses and the periodic revalidation sweep hit the database
+            if identity is None or api_key_cache.revalidation_due():
+                identity = await run_in_threadpool(resolve_api_key, x_api_key)
+
+        principal = principal_from_identity(x_api_key, identity)
+
+        state = scope.setdefault("state", {})
+        state["principal"] = principal
+        state["user_id"] = principal.user_id
+
+        await self.app(scope, receive, send)
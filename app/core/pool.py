@@ -0,0 +1,205 @@
+# app/core/pool.py
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# --- Pool Configuration (env) ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# always: ping on every checkout (SQLAlchemy pool_pre_ping)
+# idle:   ping only connections idle longer than DB_POOL_PRE_PING_IDLE seconds
+# never:  no ping, rely on DB_POOL_RECYCLE
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always").lower()
+DB_POOL_PRE_PING_IDLE = float(os.getenv("DB_POOL_PRE_PING_IDLE", 60))
+
+# Seconds between pool stats log lines (0 disables). Pool counters are
+# process-wide, so they go to the operator's logs, not the tenant API.
+DB_POOL_STATS_LOG_INTERVAL = float(os.getenv("DB_POOL_STATS_LOG_INTERVAL", 300))
+
+logger = logging.getLogger(__name__)
+
+# Checkout latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+def pool_engine_kwargs(async_engine: bool = False) -> dict:
+    """
+    create_engine / create_async_engine keyword arguments for the configured pool.
+    """
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # The idle strategy pings from a checkout listener on sync engines only
+        "pool_pre_ping": DB_POOL_PRE_PING == "always" or (async_engine and DB_POOL_PRE_PING == "idle"),
+    }
+
+
+# ---------------------------
+# 🚀 Pool Stats
+# ---------------------------
+class PoolStats:
+    """
+    Counters for one pool: checkouts, time spent in checkout, time spent
+    waiting while the pool was saturated, and a checkout latency histogram.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_time_total = 0.0
+        self.checkout_time_max = 0.0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.timeouts = 0
+        self.histogram = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, elapsed: float, waited: bool, timed_out: bool = False) -> None:
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.checkout_time_total += elapsed
+                self.checkout_time_max = max(self.checkout_time_max, elapsed)
+                self.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+            if waited:
+                self.waits += 1
+                self.wait_time_total += elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_avg_ms": round(self.checkout_time_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_max_ms": round(self.checkout_time_max * 1000, 3),
+                "waits": self.waits,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "timeouts": self.timeouts,
+                "checkout_latency_histogram_ms": {
+                    ("+Inf" if bound == float("inf") else f"le_{bound}"): count
+                    for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram)
+                },
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout; a checkout that starts on a saturated pool counts as a wait."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        saturated = self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, waited=True, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start, waited=saturated)
+        return conn
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def install_idle_pre_ping(engine) -> None:
+    """
+    DB_POOL_PRE_PING=idle: ping a connection on checkout only if it sat idle in
+    the pool long enough for MySQL to have dropped it.
+    """
+    if DB_POOL_PRE_PING != "idle":
+        return
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < DB_POOL_PRE_PING_IDLE:
+            return
+        try:
+            dbapi_connection.ping(reconnect=False)
+        except Exception:
+            # Pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError()
+
+
+def get_pool_stats(engine) -> dict:
+    """
+    Pool counters of one engine, for the periodic log line (log_pool_stats).
+    Not served over the tenant API: the pools are shared by every tenant.
+    """
+    if engine is None:
+        return {}
+
+    pool = engine.pool
+    data = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        "timeout": pool.timeout() if hasattr(pool, "timeout") else None,
+        "recycle": getattr(pool, "_recycle", None),
+        "pre_ping": DB_POOL_PRE_PING,
+    }
+    if hasattr(pool, "stats"):
+        data.update(pool.stats.snapshot())
+    return data
+
+
+def log_pool_stats(engines: dict) -> None:
+    """One log line per engine: {label: engine}, None engines skipped."""
+    for label, engine in engines.items():
+        if engine is not None:
+            logger.info(f"DB pool stats [{label}] {json.dumps(get_pool_stats(engine))}")
+
+
+def start_pool_stats_logger(engines: dict, interval: float = DB_POOL_STATS_LOG_INTERVAL):
+    """
+    Log the pool stats every `interval` seconds from a daemon thread.
+    Returns the threading.Event that stops it, or None when disabled.
+    """
+    if interval <= 0:
+        return None
+
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval):
+            try:
+                log_pool_stats(engines)
+            except Exception as e:
+                logger.warning(f"Failed to log DB pool stats: {e}")
+
+    threading.Thread(target=_run, name="db-pool-stats", daemon=True).start()
+    return stop
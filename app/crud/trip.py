@@ -1,19 +1,33 @@
 import base64
+import logging
 import os
 import io
 import json
+import operator
+import re
 import uuid
 from datetime import datetime
 from PIL import Image
-from typing import List
+from typing import Dict, List
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import DateTime, Float, and_, case, func, insert, literal, or_, select, type_coerce
+from sqlalchemy.dialects.mysql import match
 from typing import Optional
 
-from models.trip import Itinerary, Trip, TripMedia, TripPolicy, TripPricing
+from core.database import SessionLocal
+from models.destination import Destination
+from models.trip import Itinerary, Trip, TripCategory, TripDeparture, TripMedia, TripPolicy, TripDocument, TripPricing, TripRelated, TripSearch, TripTheme
 from schemas.trip import TripCreate
+from crud.trip_departure import parse_departure_date, sync_pricing_departures
+from crud.trip_related import RELATED_FEATURE_FIELDS, mark_related_trips_stale
+from crud.trip_feed import TRIP_FEED_CARD_FIELDS, TRIP_FEED_MAX_SIZE, FeaturedFeed, mark_trip_feeds_dirty, trip_feed_cache
+from crud.trip_document import delete_trip_document, load_trip_documents, save_trip_document, trip_document_cache
+from utils.fields import project, projection_options
+from utils.response import dumps_json
+
+logger = logging.getLogger(__name__)
 
 # -------------------- Slug Generator --------------------
 
@@ -52,6 +66,154 @@ def generate_image(image_input):
     return file_path
 
 
+# -------------------- Category / Theme Links --------------------
+
+def sync_trip_taxonomy(db: Session, trip_id: int, category_ids: Optional[List[str]], themes: Optional[List[str]]):
+    """
+    Dual-write: mirror the comma-separated category_id / themes columns into
+    trip_categories / trip_themes. Caller commits.
+    """
+    db.query(TripCategory).filter(TripCategory.trip_id == trip_id).delete(synchronize_session=False)
+    db.query(TripTheme).filter(TripTheme.trip_id == trip_id).delete(synchronize_session=False)
+
+    seen_categories = set()
+    for value in category_ids or []:
+        value = str(value).strip()
+        if value.isdigit() and int(value) not in seen_categories:
+            seen_categories.add(int(value))
+            db.add(TripCategory(trip_id=trip_id, category_id=int(value)))
+
+    seen_themes = set()
+    for value in themes or []:
+        value = str(value).strip()[:100]
+        # theme is part of the primary key and MySQL compares it case-insensitively
+        if value and value.lower() not in seen_themes:
+            seen_themes.add(value.lower())
+            db.add(TripTheme(trip_id=trip_id, theme=value))
+
+
+def trips_in_categories(category_ids: List[int]):
+    """Indexed (category_id, trip_id) lookup: trip ids in any of the categories."""
+    return select(TripCategory.trip_id).where(TripCategory.category_id.in_(category_ids))
+
+
+def trips_with_themes(themes: List[str]):
+    """Indexed (theme, trip_id) lookup: trip ids tagged with any of the themes."""
+    return select(TripTheme.trip_id).where(TripTheme.theme.in_(themes))
+
+
+# -------------------- Price Summary --------------------
+
+# pricing.data carries no currency of its own
+TRIP_DEFAULT_CURRENCY = os.getenv("TRIP_DEFAULT_CURRENCY", "INR")
+
+
+def derive_trip_price_fields(pricing_data: Optional[dict]) -> dict:
+    """
+    min_price / max_price / currency / next_departure for the trips row, from
+    the pricing JSON: every costingPackages final_price of a fixed_departure
+    trip, or customized.final_price. next_departure is the earliest departure
+    still ahead at write time.
+    """
+    prices, departures = [], []
+    if pricing_data:
+        if pricing_data.get("pricing_model") == "fixed_departure":
+            for fd in pricing_data.get("fixed_departure") or []:
+                prices.extend(
+                    package.get("final_price") for package in fd.get("costingPackages") or []
+                )
+                departures.append(parse_departure_date(fd.get("from_date")))
+        else:
+            prices.append((pricing_data.get("customized") or {}).get("final_price"))
+
+    prices = [float(price) for price in prices if isinstance(price, (int, float))]
+    now = datetime.now()
+    upcoming = [d for d in departures if d is not None and d >= now]
+    return {
+        "min_price": min(prices) if prices else None,
+        "max_price": max(prices) if prices else None,
+        "currency": ((pricing_data or {}).get("currency") or TRIP_DEFAULT_CURRENCY) if prices else None,
+        "next_departure": min(upcoming) if upcoming else None,
+    }
+
+
+def trip_price_criteria(price_min: Optional[float] = None, price_max: Optional[float] = None) -> tuple:
+    """Filters on the indexed starting price (Trip.min_price); unpriced trips drop out."""
+    criteria = []
+    if price_min is not None:
+        criteria.append(Trip.min_price >= price_min)
+    if price_max is not None:
+        criteria.append(Trip.min_price <= price_max)
+    return tuple(criteria)
+
+
+# -------------------- Child Rows --------------------
+
+def _pricing_data(pricing) -> dict:
+    pricing_data = jsonable_encoder(pricing)
+    # ✅ Validate costingPackages not empty before saving
+    if (
+        pricing_data.get("pricing_model") == "fixed_departure"
+        and isinstance(pricing_data.get("fixed_departure"), list)
+    ):
+        for fd in pricing_data["fixed_departure"]:
+            if not fd.get("costingPackages"):
+                raise HTTPException(status_code=400, detail="costingPackages cannot be empty")
+    return pricing_data
+
+
+def _policy_values(policy) -> dict:
+    return policy.dict() if hasattr(policy, "dict") else dict(policy)
+
+
+def _itinerary_values(day) -> dict:
+    day_data = day.dict() if hasattr(day, "dict") else dict(day)
+    day_data["image_urls"] = ",".join(day_data.get("image_urls") or [])
+    day_data["activities"] = ",".join(day_data.get("activities") or [])
+    day_data["meal_plan"] = ",".join(day_data.get("meal_plan") or [])
+    return day_data
+
+
+def _apply_changes(obj, values: dict) -> set:
+    """Set only the attributes whose value differs; returns their names."""
+    changed = set()
+    for key, value in values.items():
+        if getattr(obj, key) != value:
+            setattr(obj, key, value)
+            changed.add(key)
+    return changed
+
+
+def _sync_children(collection: list, incoming: List[dict], key: str, model) -> bool:
+    """
+    Diff a trip's child rows against incoming values matched on `key`
+    (repeated keys pair up in order). Each value's index in `incoming` is its
+    position, so reordering is an update of position alone. Matched rows get
+    only their changed columns updated, unmatched values are inserted and
+    leftover rows are removed from the collection (delete-orphan). The flush
+    batches each kind of statement. Returns whether anything changed.
+    """
+    existing: Dict[object, list] = {}
+    for row in collection:
+        existing.setdefault(getattr(row, key), []).append(row)
+
+    changed = False
+    for position, values in enumerate(incoming):
+        values = {**values, "position": position}
+        matches = existing.get(values.get(key))
+        if matches:
+            changed |= bool(_apply_changes(matches.pop(0), values))
+        else:
+            collection.append(model(**values))
+            changed = True
+
+    for rows in existing.values():
+        for row in rows:
+            collection.remove(row)
+            changed = True
+    return changed
+
+
 # -------------------- Create --------------------
 
 def create_trip(db: Session, payload: TripCreate, user_id: int):
@@ -78,16 +240,7 @@ def create_trip(db: Session, payload: TripCreate, user_id: int):
 
     # ---- Add Pricing ----
     if payload.pricing:
-        pricing_data = jsonable_encoder(payload.pricing)
-        # ✅ Validate costingPackages not empty before saving
-        if (
-            pricing_data.get("pricing_model") == "fixed_departure"
-            and isinstance(pricing_data.get("fixed_departure"), list)
-        ):
-            for fd in pricing_data["fixed_departure"]:
-                if not fd.get("costingPackages"):
-                    raise HTTPException(status_code=400, detail="costingPackages cannot be empty")
-
+        pricing_data = _pricing_data(payload.pricing)
         pricing_model = TripPricing(
             trip_id=trip_model.id,
             pricing_model=pricing_data.get("pricing_model"),
@@ -95,128 +248,620 @@ def create_trip(db: Session, payload: TripCreate, user_id: int):
         )
         db.add(pricing_model)
 
+        for key, value in derive_trip_price_fields(pricing_data).items():
+            setattr(trip_model, key, value)
+        sync_pricing_departures(db, trip_model, pricing_data)
+
     # ---- Add Policies ----
     if payload.policies:
-        for policy in payload.policies:
-            policy_data = policy.dict() if hasattr(policy, "dict") else policy
-            policy_model = TripPolicy(trip_id=trip_model.id, **policy_data)
-            db.add(policy_model)
+        for position, policy in enumerate(payload.policies):
+            db.add(TripPolicy(trip_id=trip_model.id, position=position, **_policy_values(policy)))
+
+    # ---- Category / Theme Links ----
+    sync_trip_taxonomy(db, trip_model.id, payload.category_id, payload.themes)
 
     # ---- Add Itinerary ----
     if payload.itinerary:
-        for day in payload.itinerary:
-            day_data = day.dict() if hasattr(day, "dict") else day
-            day_data["image_urls"] = ",".join(day_data.get("image_urls", []))
-            day_data["activities"] = ",".join(day_data.get("activities", []))
-            day_data["meal_plan"] = ",".join(day_data.get("meal_plan", []))
-            itinerary_model = Itinerary(trip_id=trip_model.id, **day_data)
-            db.add(itinerary_model)
+        for position, day in enumerate(payload.itinerary):
+            db.add(Itinerary(trip_id=trip_model.id, position=position, **_itinerary_values(day)))
 
+    store_trip_document(db, trip_model)
+    index_trip_for_search(db, trip_model)
+    mark_related_trips_stale(db, trip_model.user_id, [trip_model.id])
     db.commit()
     return trip_model
 
 
 # -------------------- Read --------------------
 
-def get_trips(db: Session, user_id: int, skip: int = 0, limit: int = 10, category_ids: List[int] = None,feature_trip_type: Optional[str] = None) -> list:
-    query = db.query(Trip).filter(Trip.user_id == user_id)
+# Everything serialize_trip touches. selectinload keeps the graph at one
+# SELECT per relationship (IN over the page's trip ids) instead of three lazy
+# loads per trip, and avoids the row fan-out a JOIN on two collections causes.
+# Built on call, not at import: creating a loader option configures every
+# mapper, and not every model module has been imported yet at that point.
+def trip_relationship_loaders() -> dict:
+    return {
+        "pricing": selectinload(Trip.pricing),
+        "policies": selectinload(Trip.policies),
+        "itinerary": selectinload(Trip.itinerary),
+    }
+
+
+def trip_graph_options() -> tuple:
+    return tuple(trip_relationship_loaders().values())
+
 
+def trip_load_options(fields: Optional[frozenset] = None) -> list:
+    """Full graph, or only the columns / relationships a ?fields= projection needs."""
+    loaders = trip_relationship_loaders()
+    return projection_options(Trip, fields, loaders, loaders.values())
 
-    # Filter by multiple category IDs (OR logic)
+
+# sort name -> (column, descending). Ties break on Trip.id in the same
+# direction; NULL sorts lowest (MySQL), so NULLs come first ascending and last
+# descending. Plain column order, so the (user_id, <column>, id) indexes serve it.
+TRIP_SORTS = {
+    "created_at": (Trip.created_at, True),
+    "display_order": (Trip.display_order, False),
+    "price": (Trip.min_price, False),
+}
+
+
+def _trip_list_query(db: Session, user_id: int, category_ids: List[int] = None, feature_trip_type: Optional[str] = None, themes: List[str] = None, load_fields: Optional[frozenset] = None, criteria: tuple = ()):
+    query = db.query(Trip).options(*trip_load_options(load_fields)).filter(Trip.user_id == user_id, *criteria)
+
+    # Filter by multiple category IDs (OR logic) through the trip_categories index
     if category_ids and len(category_ids) > 0:
-        filter_conditions = []
-        for cat_id in category_ids:
-            cat_str = str(cat_id)
-            filter_conditions.append(
-                or_(
-                    Trip.category_id == cat_str,
-                    Trip.category_id.like(f"{cat_str},%"),
-                    Trip.category_id.like(f"%,{cat_str}"),
-                    Trip.category_id.like(f"%,{cat_str},%")
-                )
-            )
-        query = query.filter(or_(*filter_conditions))
+        query = query.filter(Trip.id.in_(trips_in_categories(category_ids)))
+    # Filter by themes (OR logic) through the trip_themes index
+    if themes and len(themes) > 0:
+        query = query.filter(Trip.id.in_(trips_with_themes(themes)))
     if feature_trip_type:
         query = query.filter(Trip.feature_trip_type == feature_trip_type)
-    trips = query.order_by(Trip.created_at.desc()).offset(skip).limit(limit).all()
-    return [serialize_trip(t) for t in trips]
+    return query
+
+
+def _trip_ordering(sort: str) -> list:
+    column, descending = TRIP_SORTS[sort]
+    if descending:
+        return [column.desc(), Trip.id.desc()]
+    return [column.asc(), Trip.id.asc()]
+
+
+def encode_trip_cursor(sort: str, trip: Trip) -> str:
+    value = getattr(trip, TRIP_SORTS[sort][0].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "v": value, "id": trip.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_trip_cursor(cursor: str, sort: str) -> tuple:
+    """(sort value, trip id) from an opaque cursor issued for the same sort."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if data["s"] != sort:
+            raise ValueError("cursor was issued for a different sort")
+        value = data["v"]
+        if value is not None and isinstance(TRIP_SORTS[sort][0].type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _after_cursor(sort: str, value, trip_id: int):
+    """
+    Keyset predicate: rows strictly after (value, trip_id) in _trip_ordering(sort).
+    NULL sorts lowest: every non-NULL row follows a NULL cursor ascending, and
+    the NULL rows follow every non-NULL cursor descending.
+    """
+    column, descending = TRIP_SORTS[sort]
+    beyond = operator.lt if descending else operator.gt
+    if value is None:
+        same = and_(column.is_(None), beyond(Trip.id, trip_id))
+        return same if descending else or_(same, column.isnot(None))
+    after = or_(beyond(column, value), and_(column == value, beyond(Trip.id, trip_id)))
+    return or_(after, column.is_(None)) if descending else after
+
+
+def get_trips(db: Session, user_id: int, skip: int = 0, limit: int = 10, category_ids: List[int] = None,feature_trip_type: Optional[str] = None, themes: List[str] = None, sort: str = "created_at", fields: Optional[frozenset] = None, criteria: tuple = ()) -> list:
+    query = _trip_list_query(db, user_id, category_ids, feature_trip_type, themes, fields, criteria)
+    trips = query.order_by(*_trip_ordering(sort)).offset(skip).limit(limit).all()
+    return [serialize_trip(t, fields) for t in trips]
+
+
+def get_trips_page(db: Session, user_id: int, limit: int = 10, cursor: Optional[str] = None, category_ids: List[int] = None, feature_trip_type: Optional[str] = None, themes: List[str] = None, sort: str = "created_at", fields: Optional[frozenset] = None, criteria: tuple = ()) -> tuple:
+    """
+    Keyset page: (serialized trips, next_cursor). next_cursor is None on the
+    last page. Cost is independent of how deep the page is.
+    """
+    # The sort column is loaded even if not requested: the next cursor is built from it
+    load_fields = fields | {TRIP_SORTS[sort][0].key} if fields is not None else None
+    query = _trip_list_query(db, user_id, category_ids, feature_trip_type, themes, load_fields, criteria)
+    if cursor:
+        query = query.filter(_after_cursor(sort, *decode_trip_cursor(cursor, sort)))
+
+    trips = query.order_by(*_trip_ordering(sort)).limit(limit + 1).all()
+    next_cursor = encode_trip_cursor(sort, trips[limit - 1]) if len(trips) > limit else None
+    return [serialize_trip(t, fields) for t in trips[:limit]], next_cursor
+
+
+# -------------------- Featured Feed --------------------
+
+def get_featured_feed(db: Session, user_id: int, feature_trip_type: str) -> FeaturedFeed:
+    """
+    A tenant's homepage rail for one feature_trip_type: up to TRIP_FEED_MAX_SIZE
+    cards ordered by display_order, kept serialized in trip_feed_cache so a
+    warm rail costs no query and no serialization.
+    """
+    feed = trip_feed_cache.get(user_id, feature_trip_type)
+    if feed is not None:
+        return feed
+
+    generation = trip_feed_cache.generation(user_id)
+    trips = (
+        _trip_list_query(db, user_id, feature_trip_type=feature_trip_type, load_fields=TRIP_FEED_CARD_FIELDS)
+        .order_by(*_trip_ordering("display_order"))
+        .limit(TRIP_FEED_MAX_SIZE)
+        .all()
+    )
+    cards = [serialize_trip(t, TRIP_FEED_CARD_FIELDS) for t in trips]
+    feed = FeaturedFeed(ids=tuple(card["id"] for card in cards), cards=dumps_json(cards))
+    trip_feed_cache.put(user_id, feature_trip_type, feed, generation)
+    return feed
+
+
+# -------------------- Related Trips --------------------
+
+def get_related_trips(db: Session, user_id: int, trip_id: int, limit: int = 6) -> list:
+    """
+    "You may also like" cards for a trip, best first, each with its similarity
+    "score": one indexed lookup on the precomputed trip_related top-k.
+    Read-only: the lists are refreshed after every trip write (and backfilled
+    by crud.trip_related.backfill_related_trips for trips saved before that).
+    """
+    rows = (
+        db.query(Trip, TripRelated.score)
+        .join(TripRelated, TripRelated.related_trip_id == Trip.id)
+        .options(*trip_load_options(TRIP_FEED_CARD_FIELDS))
+        .filter(TripRelated.trip_id == trip_id)
+        .order_by(TripRelated.rank)
+        .limit(limit)
+        .all()
+    )
+    return [{**serialize_trip(trip, TRIP_FEED_CARD_FIELDS), "score": round(score, 4)} for trip, score in rows]
+
+
+# -------------------- Facets --------------------
+
+# Sidebar duration buckets over Trip.days: label -> (min, max); max None = open-ended
+DURATION_BUCKETS = {
+    "1-3": (1, 3),
+    "4-6": (4, 6),
+    "7-9": (7, 9),
+    "10+": (10, None),
+}
+
+
+def _duration_bucket():
+    return case(
+        *[
+            (Trip.days >= low if high is None else Trip.days.between(low, high), label)
+            for label, (low, high) in DURATION_BUCKETS.items()
+        ],
+        else_=None,
+    )
+
+
+def trip_facet_criteria(
+    category_ids: List[int] = None,
+    themes: List[str] = None,
+    destination_ids: List[int] = None,
+    destination_types: List[str] = None,
+    durations: List[str] = None,
+    hotel_categories: List[int] = None,
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+) -> Dict[str, object]:
+    """
+    Facet name -> SQL criterion for every facet the caller filtered on (OR within a facet).
+    The price range has no facet of its own, so it narrows every count.
+    """
+    criteria = {}
+    if category_ids:
+        criteria["category"] = Trip.id.in_(trips_in_categories(category_ids))
+    if themes:
+        criteria["theme"] = Trip.id.in_(trips_with_themes(themes))
+    if destination_ids:
+        criteria["destination"] = Trip.destination_id.in_(destination_ids)
+    if destination_types:
+        criteria["destination_type"] = Trip.destination_type.in_(destination_types)
+    if durations:
+        unknown = set(durations).difference(DURATION_BUCKETS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown durations: {', '.join(sorted(unknown))}")
+        criteria["duration"] = _duration_bucket().in_(durations)
+    if hotel_categories:
+        criteria["hotel_category"] = Trip.hotel_category.in_(hotel_categories)
+    price = trip_price_criteria(price_min, price_max)
+    if price:
+        criteria["price"] = and_(*price)
+    return criteria
+
+
+def get_trip_facets(db: Session, user_id: int, criteria: Dict[str, object], feature_trip_type: Optional[str] = None) -> dict:
+    """
+    Counts per category, theme, destination, destination_type, duration bucket
+    and hotel_category: one GROUP BY query per facet (six in total).
+    Each facet is counted with every filter applied except its own, so a
+    sidebar still shows the alternatives to what is already selected.
+    """
+    def scope(facet: str) -> list:
+        scoped = [Trip.user_id == user_id, *(c for name, c in criteria.items() if name != facet)]
+        if feature_trip_type:
+            scoped.append(Trip.feature_trip_type == feature_trip_type)
+        return scoped
+
+    def counts(rows) -> list:
+        return [{"value": value, "count": count} for value, count in rows if value is not None]
+
+    trip_count = func.count(Trip.id.distinct())
+    bucket = _duration_bucket()
+
+    destinations = (
+        db.query(Trip.destination_id, Destination.title, trip_count)
+        .outerjoin(Destination, Destination.id == Trip.destination_id)
+        .filter(*scope("destination"))
+        .group_by(Trip.destination_id, Destination.title)
+        .order_by(trip_count.desc())
+        .all()
+    )
+
+    return {
+        "category": counts(
+            db.query(TripCategory.category_id, trip_count)
+            .join(Trip, Trip.id == TripCategory.trip_id)
+            .filter(*scope("category"))
+            .group_by(TripCategory.category_id)
+            .order_by(trip_count.desc())
+            .all()
+        ),
+        "theme": counts(
+            db.query(TripTheme.theme, trip_count)
+            .join(Trip, Trip.id == TripTheme.trip_id)
+            .filter(*scope("theme"))
+            .group_by(TripTheme.theme)
+            .order_by(trip_count.desc())
+            .all()
+        ),
+        "destination": [
+            {"value": destination_id, "title": title, "count": count}
+            for destination_id, title, count in destinations
+        ],
+        "destination_type": counts(
+            db.query(Trip.destination_type, trip_count)
+            .filter(*scope("destination_type"))
+            .group_by(Trip.destination_type)
+            .order_by(trip_count.desc())
+            .all()
+        ),
+        "duration": sorted(
+            counts(
+                db.query(bucket, trip_count)
+                .filter(*scope("duration"))
+                .group_by(bucket)
+                .all()
+            ),
+            key=lambda c: list(DURATION_BUCKETS).index(c["value"]),
+        ),
+        "hotel_category": counts(
+            db.query(Trip.hotel_category, trip_count)
+            .filter(*scope("hotel_category"))
+            .group_by(Trip.hotel_category)
+            .order_by(Trip.hotel_category)
+            .all()
+        ),
+    }
 
 
 def get_trip_by_id(db: Session, trip_id: int) -> dict:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = db.query(Trip).options(*trip_graph_options()).filter(Trip.id == trip_id).first()
     return serialize_trip(trip) if trip else None
 
 
+def trip_version(version: Optional[int]) -> str:
+    return str(version or "")
+
+
+def get_trip_version(db: Session, trip_id: int) -> Optional[str]:
+    """Version counter of a trip as a string (None if missing); the cheap ETag lookup for GET /trips/{id}."""
+    row = db.query(Trip.version).filter(Trip.id == trip_id).first()
+    return trip_version(row.version) if row else None
+
+
+def get_trip_versions(db: Session, trip_ids: List[int]) -> Dict[int, str]:
+    """trip_id -> version for the trips that exist, in one IN query."""
+    rows = db.query(Trip.id, Trip.version).filter(Trip.id.in_(trip_ids)).all()
+    return {row.id: trip_version(row.version) for row in rows}
+
+
+# -------------------- Search --------------------
+
+# InnoDB's default innodb_ft_min_token_size: shorter words are not indexed
+SEARCH_MIN_TOKEN_SIZE = 3
+
+
+def index_trip_for_search(db: Session, trip: Trip) -> None:
+    """Rewrite the trip's trip_search row; the caller commits."""
+    destination_name = db.query(Destination.title).filter(Destination.id == trip.destination_id).scalar()
+    body = "\n".join(filter(None, [
+        trip.overview,
+        trip.highlights,
+        trip.inclusions,
+        *(day.title for day in trip.itinerary),
+        destination_name,
+    ]))
+    db.merge(TripSearch(trip_id=trip.id, title=trip.title, body=body))
+
+
+def _boolean_search_query(q: str) -> Optional[str]:
+    """'ladakh bike' -> '+ladakh* +bike*': every word required, each as a prefix."""
+    words = [w for w in re.findall(r"\w+", q.lower()) if len(w) >= SEARCH_MIN_TOKEN_SIZE]
+    return " ".join(f"+{w}*" for w in words) or None
+
+
+def search_trips(db: Session, user_id: int, q: str, page: int = 1, per_page: int = 20, fields: Optional[frozenset] = None) -> tuple:
+    """
+    Ranked FULLTEXT search over trip_search: (serialized trips with a "score",
+    total matches). Title hits weigh double.
+    """
+    terms = _boolean_search_query(q)
+    if terms is None:
+        return [], 0
+
+    title_match = match(TripSearch.title, against=terms).in_boolean_mode()
+    text_match = match(TripSearch.title, TripSearch.body, against=terms).in_boolean_mode()
+    score = (type_coerce(title_match, Float) * 2 + type_coerce(text_match, Float)).label("score")
+
+    matches = (
+        db.query(Trip.id, score)
+        .join(TripSearch, TripSearch.trip_id == Trip.id)
+        .filter(Trip.user_id == user_id, text_match)
+    )
+    total = matches.count()
+    rows = matches.order_by(score.desc(), Trip.id.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    if not rows:
+        return [], total
+
+    trips = {t.id: t for t in db.query(Trip).options(*trip_load_options(fields)).filter(Trip.id.in_([r.id for r in rows])).all()}
+    results = []
+    for row in rows:
+        if row.id in trips:
+            results.append({**serialize_trip(trips[row.id], fields), "score": round(float(row.score), 4)})
+    return results, total
+
+
+# -------------------- Materialized Documents --------------------
+
+def store_trip_document(db: Session, trip: Trip) -> None:
+    """
+    Regenerate the trip's stored document inside the caller's transaction,
+    so it commits (or rolls back) together with the trip change.
+    """
+    db.flush()
+    # Version as the UPDATE just bumped it, and children added through
+    # db.add() which are not on the loaded collections yet
+    db.refresh(trip, ["version", "updated_at"])
+    db.expire(trip, ["pricing", "policies", "itinerary"])
+    save_trip_document(db, trip.id, trip_version(trip.version), dumps_json(serialize_trip(trip)))
+
+
+def get_trip_documents(db: Session, versions: Dict[int, str]) -> tuple:
+    """
+    (trip_id -> serialized trip (JSON bytes), ids regenerated) for the given
+    current versions. Stored documents are used when they match; the rest
+    (written before the table existed, or by a path that bypasses crud.trip)
+    are regenerated in one eager-loaded query and kept in this worker's LRU
+    only: reads never write. Persist them with backfill_trip_documents.
+    """
+    documents = load_trip_documents(db, versions)
+    stale = [trip_id for trip_id in versions if trip_id not in documents]
+    if not stale:
+        return documents, []
+
+    for trip in db.query(Trip).options(*trip_graph_options()).filter(Trip.id.in_(stale)).all():
+        documents[trip.id] = dumps_json(serialize_trip(trip))
+        trip_document_cache.put(trip.id, trip_version(trip.version), documents[trip.id])
+    return documents, [trip_id for trip_id in stale if trip_id in documents]
+
+
+def backfill_trip_documents(user_id: Optional[int], trip_ids: List[int]) -> None:
+    """
+    Store the current documents of trips a read had to regenerate. Scheduled
+    as a background task by the trip read endpoints; own session, commits.
+    Losing a race with another worker's backfill or a write is harmless: the
+    next read regenerates from memory again.
+    """
+    if SessionLocal is None or not trip_ids:
+        return
+    db = SessionLocal()
+    db.info["user_id"] = user_id
+    db.info["pinned_to_primary"] = True
+    try:
+        # Stored rows are loaded once and updated in place; merge() would select each id again
+        stored = {
+            row.trip_id: row
+            for row in db.query(TripDocument).filter(TripDocument.trip_id.in_(trip_ids)).all()
+        }
+        for trip in db.query(Trip).options(*trip_graph_options()).filter(Trip.id.in_(trip_ids)).all():
+            version = trip_version(trip.version)
+            row = stored.get(trip.id)
+            if row is None:
+                db.add(TripDocument(trip_id=trip.id, version=version, document=dumps_json(serialize_trip(trip))))
+            elif row.version != version:
+                row.version = version
+                row.document = dumps_json(serialize_trip(trip))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to store trip documents {trip_ids}: {e}")
+    finally:
+        db.close()
+
+
 # -------------------- Update --------------------
 
-def update_trip(db: Session, trip_id: int, payload: TripCreate):
+def update_trip(db: Session, trip_id: int, payload: TripCreate, partial: bool = False):
+    """
+    PUT (partial=False) sets every field; PATCH (partial=True) only the fields
+    present in the request body. Either way only real differences are written:
+    itinerary days / policies are diffed against their rows, pricing is left
+    alone when its JSON is unchanged, and a no-op save does not touch the trip
+    or move its version.
+    """
+    provided = payload.dict(exclude_unset=partial)
+
     # Unique slug check
-    if payload.slug:
+    if provided.get("slug"):
         existing_slug = db.query(Trip).filter(Trip.slug == payload.slug, Trip.id != trip_id).first()
         if existing_slug:
-            payload.slug = generate_unique_slug(db, payload.slug)
+            payload.slug = provided["slug"] = generate_unique_slug(db, payload.slug)
 
     trip_model = db.query(Trip).filter(Trip.id == trip_id).first()
     if not trip_model:
         raise HTTPException(status_code=404, detail="Trip not found.")
 
     # Update core fields
-    trip_fields = payload.dict(exclude={"pricing", "policies", "itinerary"})
-    trip_fields["category_id"] = ",".join(payload.category_id or [])
-    trip_fields["themes"] = ",".join(payload.themes or [])
-    trip_fields["faqs"] = json.dumps(payload.faqs or [])
-    trip_fields["gallery_images"] = json.dumps(payload.gallery_images or [])
-    trip_fields["hero_image"] = payload.hero_image
-
-    for key, value in trip_fields.items():
-        setattr(trip_model, key, value)
-
-    # Update Pricing
-    if payload.pricing:
-        pricing_data = jsonable_encoder(payload.pricing)
-        if (
-            pricing_data.get("pricing_model") == "fixed_departure"
-            and isinstance(pricing_data.get("fixed_departure"), list)
-        ):
-            for fd in pricing_data["fixed_departure"]:
-                if not fd.get("costingPackages"):
-                    raise HTTPException(status_code=400, detail="costingPackages cannot be empty")
+    trip_fields = {key: value for key, value in provided.items() if key not in ("pricing", "policies", "itinerary")}
+    if "category_id" in trip_fields:
+        trip_fields["category_id"] = ",".join(payload.category_id or [])
+    if "themes" in trip_fields:
+        trip_fields["themes"] = ",".join(payload.themes or [])
+    if "faqs" in trip_fields:
+        trip_fields["faqs"] = json.dumps(payload.faqs or [])
+    if "gallery_images" in trip_fields:
+        trip_fields["gallery_images"] = json.dumps(payload.gallery_images or [])
+
+    changed = _apply_changes(trip_model, trip_fields)
+
+    # Category / Theme Links
+    if {"category_id", "themes"} & changed:
+        sync_trip_taxonomy(
+            db, trip_model.id,
+            (trip_model.category_id or "").split(","), (trip_model.themes or "").split(","),
+        )
 
+    # Update Pricing (skipped when the JSON is unchanged)
+    if provided.get("pricing"):
+        pricing_data = _pricing_data(payload.pricing)
         pricing_json = json.dumps(pricing_data)
-        if trip_model.pricing:
+        if not trip_model.pricing:
+            db.add(TripPricing(trip_id=trip_model.id, pricing_model=pricing_data.get("pricing_model"), data=pricing_json))
+            changed.add("pricing")
+        elif trip_model.pricing.data != pricing_json:
             trip_model.pricing.pricing_model = pricing_data.get("pricing_model")
             trip_model.pricing.data = pricing_json
-        else:
-            db.add(TripPricing(trip_id=trip_model.id, pricing_model=pricing_data.get("pricing_model"), data=pricing_json))
-
-    # Replace Policies
-    if payload.policies is not None:
-        db.query(TripPolicy).filter(TripPolicy.trip_id == trip_model.id).delete()
-        for policy in payload.policies:
-            policy_data = policy.dict() if hasattr(policy, "dict") else policy
-            db.add(TripPolicy(trip_id=trip_model.id, **policy_data))
-
-    # Replace Itinerary
-    if payload.itinerary is not None:
-        db.query(Itinerary).filter(Itinerary.trip_id == trip_model.id).delete()
-        for day in payload.itinerary:
-            day_data = day.dict() if hasattr(day, "dict") else day
-            day_data["image_urls"] = ",".join(day_data.get("image_urls", []))
-            day_data["activities"] = ",".join(day_data.get("activities", []))
-            day_data["meal_plan"] = ",".join(day_data.get("meal_plan", []))
-            db.add(Itinerary(trip_id=trip_model.id, **day_data))
-
+            changed.add("pricing")
+        # Also catches a next_departure that has gone by since the last save
+        changed |= _apply_changes(trip_model, derive_trip_price_fields(pricing_data))
+        if "pricing" in changed:
+            sync_pricing_departures(db, trip_model, pricing_data)
+
+    # Policies / Itinerary: matched on title / day_number
+    if provided.get("policies") is not None:
+        if _sync_children(trip_model.policies, [_policy_values(p) for p in payload.policies], "title", TripPolicy):
+            changed.add("policies")
+    if provided.get("itinerary") is not None:
+        if _sync_children(trip_model.itinerary, [_itinerary_values(d) for d in payload.itinerary], "day_number", Itinerary):
+            changed.add("itinerary")
+
+    if not changed:
+        return trip_model
+
+    # Bump explicitly: a child-only edit (pricing/policies/itinerary) in the same
+    # second as the previous write leaves updated_at equal, so no UPDATE would run
+    trip_model.version = Trip.version + 1
+    trip_model.updated_at = datetime.now().replace(microsecond=0)
+
+    store_trip_document(db, trip_model)
+    index_trip_for_search(db, trip_model)
+    if RELATED_FEATURE_FIELDS & changed:
+        mark_related_trips_stale(db, trip_model.user_id, [trip_model.id])
     db.commit()
     db.refresh(trip_model)
     return trip_model
 
 
+# -------------------- Clone --------------------
+
+# Child tables copied along with the trip row (trip_search / trip_documents /
+# trip_departures are rebuilt from the copy)
+TRIP_CLONE_CHILDREN = (TripPricing, TripPolicy, Itinerary, TripCategory, TripTheme)
+
+
+def _insert_select(table, source_trip_id: int, values: dict):
+    """
+    INSERT INTO <table> SELECT ... FROM <table> WHERE trip (or trip_id) = source:
+    every column is copied except the autoincrement id, with `values` substituted.
+    """
+    columns = [c for c in table.columns if c.name != "id"]
+    key = table.c.id if table is Trip.__table__ else table.c.trip_id
+    rows = select(*[
+        literal(values[c.name], type_=c.type) if c.name in values else c
+        for c in columns
+    ]).where(key == source_trip_id)
+    if "is_deleted" in table.c:
+        rows = rows.where(table.c.is_deleted == 0)
+    return insert(table).from_select([c.name for c in columns], rows)
+
+
+def clone_trip(db: Session, trip_id: int, overrides: dict) -> Trip:
+    """
+    Copy a trip with its pricing, policies, itinerary and category/theme links
+    in one transaction: one set-based INSERT ... SELECT per table, so the cost
+    does not grow with itinerary length. The copy gets a unique slug.
+    """
+    source = db.query(Trip.id, Trip.slug).filter(Trip.id == trip_id).first()
+    if not source:
+        raise HTTPException(status_code=404, detail="Trip not found.")
+
+    values = dict(overrides)
+    base_slug = values.get("slug") or source.slug
+    values["slug"] = generate_unique_slug(db, base_slug) if base_slug else None
+
+    now = datetime.now().replace(microsecond=0)
+    new_id = db.execute(
+        _insert_select(Trip.__table__, trip_id, {**values, "created_at": now, "updated_at": now, "version": 1})
+    ).lastrowid
+
+    for model in TRIP_CLONE_CHILDREN:
+        table = model.__table__
+        timestamps = {name: now for name in ("created_at", "updated_at") if name in table.c}
+        db.execute(_insert_select(table, trip_id, {"trip_id": new_id, **timestamps}))
+
+    clone = db.query(Trip).filter(Trip.id == new_id).one()
+    if clone.pricing:
+        sync_pricing_departures(db, clone, json.loads(clone.pricing.data))
+    store_trip_document(db, clone)
+    index_trip_for_search(db, clone)
+    # The trip row was inserted outside the ORM, so no flush event saw it
+    mark_trip_feeds_dirty(db, clone.user_id)
+    mark_related_trips_stale(db, clone.user_id, [clone.id])
+    db.commit()
+    return clone
+
+
 # -------------------- Delete --------------------
 
 def delete_trip(db: Session, trip_id: int) -> dict:
     trip = db.query(Trip).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
+    delete_trip_document(db, trip_id)
+    db.query(TripSearch).filter(TripSearch.trip_id == trip_id).delete(synchronize_session=False)
+    db.query(TripDeparture).filter(TripDeparture.trip_id == trip_id).delete(synchronize_session=False)
+    mark_related_trips_stale(db, trip.user_id, [trip_id])
     db.delete(trip)
     db.commit()
     return {"message": f"Trip '{trip.title}' deleted successfully"}
@@ -260,51 +905,60 @@ def normalize_fixed_departure(data: str) -> dict:
         }
 
 
-def serialize_trip(trip: Trip) -> dict:
-    return {
-        "id": trip.id,
-        "title": trip.title,
-        "overview": trip.overview,
-        "destination_id": trip.destination_id,
-        "destination_type": trip.destination_type,
-        "category_id": trip.category_id.split(",") if trip.category_id else [],
-        "themes": trip.themes.split(",") if trip.themes else [],
-        "hotel_category": trip.hotel_category,
-        "pickup_location": trip.pickup_location,
-        "drop_location": trip.drop_location,
-        "days": trip.days,
-        "nights": trip.nights,
-        "meta_tags": trip.meta_tags,
-        "slug": trip.slug,
-        "pricing_model": trip.pricing_model,
-        "highlights": trip.highlights,
-        "inclusions": trip.inclusions,
-        "exclusions": trip.exclusions,
-        "faqs": json.loads(trip.faqs) if trip.faqs else [],
-        "terms": trip.terms,
-        "privacy_policy": trip.privacy_policy,
-        "payment_terms": trip.payment_terms,
-        "created_at": trip.created_at,
-        "updated_at": trip.updated_at,
-        "hero_image": trip.hero_image,
-        "meta_title": trip.meta_title,
-        "meta_description" : trip.meta_description,
-        "feature_trip_flag": trip.feature_trip_flag,
-        "feature_trip_type" : trip.feature_trip_type,
-        "display_order" : trip.display_order,
-        "gallery_images": json.loads(trip.gallery_images) if trip.gallery_images else [],
-        "pricing": normalize_fixed_departure(trip.pricing.data) if trip.pricing else None,
-        "policies": [{"title": p.title, "content": p.content} for p in trip.policies] if trip.policies else [],
-        "itinerary": [
-            {
-                "day_number": i.day_number,
-                "title": i.title,
-                "description": i.description,
-                "image_urls": i.image_urls.split(",") if i.image_urls else [],
-                "activities": i.activities.split(",") if i.activities else [],
-                "hotel_name": i.hotel_name,
-                "meal_plan": i.meal_plan.split(",") if i.meal_plan else []
-            }
-            for i in trip.itinerary
-        ] if trip.itinerary else []
-    }
+# Field name -> value. Scalar field names are Trip column names, which is what
+# lets utils.fields.projection_options push ?fields= down to load_only().
+TRIP_FIELDS = {
+    "id": lambda trip: trip.id,
+    "title": lambda trip: trip.title,
+    "overview": lambda trip: trip.overview,
+    "destination_id": lambda trip: trip.destination_id,
+    "destination_type": lambda trip: trip.destination_type,
+    "category_id": lambda trip: trip.category_id.split(",") if trip.category_id else [],
+    "themes": lambda trip: trip.themes.split(",") if trip.themes else [],
+    "hotel_category": lambda trip: trip.hotel_category,
+    "pickup_location": lambda trip: trip.pickup_location,
+    "drop_location": lambda trip: trip.drop_location,
+    "days": lambda trip: trip.days,
+    "nights": lambda trip: trip.nights,
+    "meta_tags": lambda trip: trip.meta_tags,
+    "slug": lambda trip: trip.slug,
+    "pricing_model": lambda trip: trip.pricing_model,
+    "highlights": lambda trip: trip.highlights,
+    "inclusions": lambda trip: trip.inclusions,
+    "exclusions": lambda trip: trip.exclusions,
+    "faqs": lambda trip: json.loads(trip.faqs) if trip.faqs else [],
+    "terms": lambda trip: trip.terms,
+    "privacy_policy": lambda trip: trip.privacy_policy,
+    "payment_terms": lambda trip: trip.payment_terms,
+    "created_at": lambda trip: trip.created_at,
+    "updated_at": lambda trip: trip.updated_at,
+    "hero_image": lambda trip: trip.hero_image,
+    "meta_title": lambda trip: trip.meta_title,
+    "meta_description": lambda trip: trip.meta_description,
+    "feature_trip_flag": lambda trip: trip.feature_trip_flag,
+    "feature_trip_type": lambda trip: trip.feature_trip_type,
+    "display_order": lambda trip: trip.display_order,
+    "min_price": lambda trip: trip.min_price,
+    "max_price": lambda trip: trip.max_price,
+    "currency": lambda trip: trip.currency,
+    "next_departure": lambda trip: trip.next_departure,
+    "gallery_images": lambda trip: json.loads(trip.gallery_images) if trip.gallery_images else [],
+    "pricing": lambda trip: normalize_fixed_departure(trip.pricing.data) if trip.pricing else None,
+    "policies": lambda trip: [{"title": p.title, "content": p.content} for p in trip.policies] if trip.policies else [],
+    "itinerary": lambda trip: [
+        {
+            "day_number": i.day_number,
+            "title": i.title,
+            "description": i.description,
+            "image_urls": i.image_urls.split(",") if i.image_urls else [],
+            "activities": i.activities.split(",") if i.activities else [],
+            "hotel_name": i.hotel_name,
+            "meal_plan": i.meal_plan.split(",") if i.meal_plan else []
+        }
+        for i in trip.itinerary
+    ] if trip.itinerary else [],
+}
+
+
+def serialize_trip(trip: Trip, fields: Optional[frozenset] = None) -> dict:
+    return project(fields, TRIP_FIELDS, trip)
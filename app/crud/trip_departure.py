@@ -0,0 +1,124 @@
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, load_only
+
+from models.fixed_departure import FixedDeparture
+from models.trip import Trip, TripDeparture
+
+SOURCE_PRICING = "pricing"
+SOURCE_FIXED_DEPARTURE = "fixed_departure"
+
+# Trip columns returned next to each trip's departures
+DEPARTURE_TRIP_FIELDS = ("id", "title", "slug", "hero_image", "days", "nights", "min_price", "currency")
+
+
+def parse_departure_date(value) -> Optional[datetime]:
+    """Naive datetime from a pricing JSON date (ISO string) or a datetime."""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+# ---------------------------
+# trip_departures writes (caller commits)
+# ---------------------------
+def sync_pricing_departures(db: Session, trip: Trip, pricing_data: Optional[dict]) -> None:
+    """Replace the trip's pricing-derived departures with fixed_departure[*] of pricing_data."""
+    db.query(TripDeparture).filter(
+        TripDeparture.trip_id == trip.id, TripDeparture.source == SOURCE_PRICING
+    ).delete(synchronize_session=False)
+
+    if not pricing_data or pricing_data.get("pricing_model") != "fixed_departure":
+        return
+
+    rows = []
+    for fd in pricing_data.get("fixed_departure") or []:
+        start_date = parse_departure_date(fd.get("from_date"))
+        if start_date is None:
+            continue
+        packages = fd.get("costingPackages") or []
+        prices = [p.get("final_price") for p in packages if isinstance(p.get("final_price"), (int, float))]
+        rows.append(TripDeparture(
+            trip_id=trip.id,
+            user_id=trip.user_id,
+            source=SOURCE_PRICING,
+            title=fd.get("title"),
+            start_date=start_date,
+            end_date=parse_departure_date(fd.get("to_date")),
+            available_slots=fd.get("available_slots"),
+            min_price=min(prices) if prices else None,
+            packages=json.dumps(packages),
+        ))
+    db.add_all(rows)
+
+
+def sync_fixed_departure(db: Session, fd: FixedDeparture) -> None:
+    """Upsert the departure row mirroring a fixed_departures row (fd.id must be assigned)."""
+    row = db.query(TripDeparture).filter(
+        TripDeparture.source == SOURCE_FIXED_DEPARTURE, TripDeparture.source_id == fd.id
+    ).first()
+    if row is None:
+        row = TripDeparture(source=SOURCE_FIXED_DEPARTURE, source_id=fd.id)
+        db.add(row)
+
+    row.trip_id = fd.trip_id
+    row.user_id = db.query(Trip.user_id).filter(Trip.id == fd.trip_id).scalar()
+    row.title = fd.title
+    row.start_date = fd.start_date
+    row.end_date = fd.end_date
+
+
+def delete_fixed_departure_row(db: Session, fd_id: int) -> None:
+    db.query(TripDeparture).filter(
+        TripDeparture.source == SOURCE_FIXED_DEPARTURE, TripDeparture.source_id == fd_id
+    ).delete(synchronize_session=False)
+
+
+# ---------------------------
+# Date-range search
+# ---------------------------
+def serialize_departure(departure: TripDeparture) -> dict:
+    return {
+        "title": departure.title,
+        "start_date": departure.start_date,
+        "end_date": departure.end_date,
+        "available_slots": departure.available_slots,
+        "min_price": departure.min_price,
+        "packages": json.loads(departure.packages) if departure.packages else [],
+    }
+
+
+def get_departures_between(db: Session, user_id: int, start: datetime, end: datetime, available_only: bool = True, limit: int = 200) -> List[dict]:
+    """
+    Trips departing in [start, end), each with its departures in the window
+    (earliest first). One range scan on (user_id, start_date) joined to trips
+    by primary key; `limit` caps the number of departures.
+    """
+    query = (
+        db.query(TripDeparture, Trip)
+        .join(Trip, Trip.id == TripDeparture.trip_id)
+        .options(load_only(*[getattr(Trip, name) for name in DEPARTURE_TRIP_FIELDS]))
+        .filter(
+            TripDeparture.user_id == user_id,
+            TripDeparture.start_date >= start,
+            TripDeparture.start_date < end,
+        )
+    )
+    if available_only:
+        # Slots are only tracked for pricing departures; NULL means not tracked
+        query = query.filter(or_(TripDeparture.available_slots.is_(None), TripDeparture.available_slots > 0))
+
+    trips = {}
+    for departure, trip in query.order_by(TripDeparture.start_date, TripDeparture.id).limit(limit).all():
+        entry = trips.get(trip.id)
+        if entry is None:
+            entry = trips[trip.id] = {name: getattr(trip, name) for name in DEPARTURE_TRIP_FIELDS}
+            entry["departures"] = []
+        entry["departures"].append(serialize_departure(departure))
+    return list(trips.values())
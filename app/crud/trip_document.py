@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from models.trip import TripDocument
+
+# --- Cache Configuration ---
+TRIP_DOCUMENT_CACHE_SIZE = int(os.getenv("TRIP_DOCUMENT_CACHE_SIZE", 2000))
+
+
+# ---------------------------
+# 🚀 In-process LRU
+# ---------------------------
+class TripDocumentLRU:
+    """
+    trip_id -> (version, document bytes). A hit only counts when the caller's
+    version matches, so an entry left behind by another worker's write is
+    never served.
+    """
+    def __init__(self, max_size: int = TRIP_DOCUMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, trip_id: int, version: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(trip_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(trip_id)
+            return entry[1]
+
+    def put(self, trip_id: int, version: str, document: bytes) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[trip_id] = (version, document)
+            self._entries.move_to_end(trip_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, trip_id: int) -> None:
+        with self._lock:
+            self._entries.pop(trip_id, None)
+
+
+trip_document_cache = TripDocumentLRU()
+
+
+# ---------------------------
+# trip_documents access (serialization lives in crud.trip)
+# ---------------------------
+def save_trip_document(db: Session, trip_id: int, version: str, document: bytes) -> None:
+    """Upsert a trip's document; the caller commits."""
+    db.merge(TripDocument(trip_id=trip_id, version=version, document=document))
+
+
+def delete_trip_document(db: Session, trip_id: int) -> None:
+    db.query(TripDocument).filter(TripDocument.trip_id == trip_id).delete(synchronize_session=False)
+    trip_document_cache.invalidate(trip_id)
+
+
+def load_trip_documents(db: Session, versions: Dict[int, str]) -> Dict[int, bytes]:
+    """
+    trip_id -> document for every trip whose stored document matches the
+    given current version: in-process LRU first, then one IN query on
+    trip_documents. Missing or stale ids are simply absent from the result.
+    """
+    documents: Dict[int, bytes] = {}
+    for trip_id, version in versions.items():
+        cached = trip_document_cache.get(trip_id, version)
+        if cached is not None:
+            documents[trip_id] = cached
+
+    missing = [trip_id for trip_id in versions if trip_id not in documents]
+    if missing:
+        rows = db.query(TripDocument.trip_id, TripDocument.version, TripDocument.document).filter(
+            TripDocument.trip_id.in_(missing)
+        ).all()
+        for row in rows:
+            if row.version == versions[row.trip_id]:
+                documents[row.trip_id] = row.document
+                trip_document_cache.put(row.trip_id, row.version, row.document)
+
+    return documents
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from core.database import TenantSession
+from models.trip import Trip
+
+# --- Cache Configuration ---
+# Bounds how long another worker's write can go unseen (invalidation is per process)
+TRIP_FEED_CACHE_TTL = float(os.getenv("TRIP_FEED_CACHE_TTL", 60))
+TRIP_FEED_CACHE_MAX_SIZE = int(os.getenv("TRIP_FEED_CACHE_MAX_SIZE", 1000))
+# Cards kept per feed
+TRIP_FEED_MAX_SIZE = int(os.getenv("TRIP_FEED_MAX_SIZE", 50))
+
+# Card projection (crud.trip.TRIP_FIELDS names). A change to any of these, or
+# to the trip's tenant / soft-delete flag, drops the tenant's feeds; pricing
+# edits reach the card through the derived min_price / currency / next_departure.
+TRIP_FEED_CARD_FIELDS = frozenset({
+    "id", "title", "slug", "hero_image", "destination_id", "days", "nights",
+    "min_price", "currency", "next_departure",
+    "feature_trip_flag", "feature_trip_type", "display_order",
+})
+TRIP_FEED_WATCHED = TRIP_FEED_CARD_FIELDS | {"user_id", "is_deleted"}
+
+
+class FeaturedFeed(NamedTuple):
+    ids: tuple
+    cards: bytes  # JSON array of card dicts
+
+
+# ---------------------------
+# 🚀 Per-tenant Feed Cache
+# ---------------------------
+class TripFeedCache:
+    """
+    In-process TTL cache: (user_id, feature_trip_type) -> FeaturedFeed.
+      - Entries expire after `ttl` seconds; oldest are evicted past `max_size`
+      - invalidate_tenant() drops every feed of a tenant and bumps its
+        generation, so a feed built from data read before the write is not stored
+    """
+    def __init__(self, ttl: float = TRIP_FEED_CACHE_TTL, max_size: int = TRIP_FEED_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, tuple[float, FeaturedFeed]]" = OrderedDict()
+        self._generations: dict = {}
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id: int, feature_trip_type: str) -> Optional[FeaturedFeed]:
+        key = (user_id, feature_trip_type)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, feed = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return feed
+
+    def put(self, user_id: int, feature_trip_type: str, feed: FeaturedFeed, generation: int) -> None:
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+
+        key = (user_id, feature_trip_type)
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, feed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_tenant(self, user_id: int) -> None:
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+trip_feed_cache = TripFeedCache()
+
+
+# ---------------------------
+# Invalidation on commit of a trip write
+# ---------------------------
+def mark_trip_feeds_dirty(db: Session, user_id: Optional[int]) -> None:
+    """Drop the tenant's feeds once `db` commits (for writes that bypass the ORM, e.g. INSERT ... SELECT)."""
+    db.info.setdefault("dirty_trip_feeds", set()).add(user_id)
+
+
+@event.listens_for(TenantSession, "after_flush")
+def _collect_dirty_trip_feeds(session, flush_context):
+    # new / dirty / deleted and attribute history still describe the flush here
+    for obj in session.new.union(session.deleted):
+        if isinstance(obj, Trip):
+            mark_trip_feeds_dirty(session, obj.user_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Trip):
+            state = inspect(obj)
+            watched = TRIP_FEED_WATCHED.intersection(state.attrs.keys())
+            if any(state.attrs[name].history.has_changes() for name in watched):
+                mark_trip_feeds_dirty(session, obj.user_id)
+
+
+@event.listens_for(TenantSession, "after_commit")
+def _drop_dirty_trip_feeds(session):
+    for user_id in session.info.pop("dirty_trip_feeds", ()):
+        trip_feed_cache.invalidate_tenant(user_id)
+
+
+@event.listens_for(TenantSession, "after_rollback")
+def _forget_dirty_trip_feeds(session):
+    session.info.pop("dirty_trip_feeds", None)
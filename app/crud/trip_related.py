@@ -0,0 +1,272 @@
+import logging
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from core.database import SessionLocal
+from models.trip import Trip, TripCategory, TripRelated, TripTheme
+
+logger = logging.getLogger(__name__)
+
+# --- Similarity Configuration ---
+TRIP_RELATED_TOP_K = int(os.getenv("TRIP_RELATED_TOP_K", 12))
+# Rows scored per matrix block (block x catalogue floats in memory at once)
+TRIP_RELATED_BLOCK_SIZE = int(os.getenv("TRIP_RELATED_BLOCK_SIZE", 512))
+
+# Feature weights (sum to 1, so a score is in [0, 1])
+RELATED_WEIGHTS = {
+    "category": 0.30,
+    "theme": 0.25,
+    "destination": 0.25,
+    "duration": 0.10,
+    "price": 0.10,
+}
+# Days apart at which duration similarity reaches 0
+RELATED_DURATION_SPAN = 7.0
+# Price ratio at which price similarity reaches 0 (2.0 = one trip twice the other)
+RELATED_PRICE_SPAN = float(np.log(2.0))
+
+# Trip columns a related-trip score depends on (plus the category / theme links)
+RELATED_FEATURE_FIELDS = frozenset({"category_id", "themes", "destination_id", "days", "min_price"})
+
+
+class _Catalogue(NamedTuple):
+    ids: np.ndarray           # trip ids, row order of every matrix below
+    categories: np.ndarray    # one-hot (trips x categories), float32
+    themes: np.ndarray        # one-hot (trips x themes), float32
+    destination: np.ndarray   # destination_id
+    days: np.ndarray          # float, NaN when unknown
+    log_price: np.ndarray     # log1p(min_price), NaN when unpriced
+
+
+def _one_hot(ids: List[int], links: Dict[int, Iterable]) -> np.ndarray:
+    values = sorted({value for linked in links.values() for value in linked})
+    column = {value: i for i, value in enumerate(values)}
+    matrix = np.zeros((len(ids), len(values)), dtype=np.float32)
+    for row, trip_id in enumerate(ids):
+        for value in links.get(trip_id, ()):
+            matrix[row, column[value]] = 1.0
+    return matrix
+
+
+def _load_catalogue(db: Session, user_id: int) -> _Catalogue:
+    """Feature matrices for the tenant's trips: three queries, no trip graph."""
+    trips = db.query(Trip.id, Trip.destination_id, Trip.days, Trip.min_price).filter(
+        Trip.user_id == user_id
+    ).order_by(Trip.id).all()
+    ids = [t.id for t in trips]
+
+    categories: Dict[int, set] = {}
+    for trip_id, category_id in db.query(TripCategory.trip_id, TripCategory.category_id).filter(
+        TripCategory.trip_id.in_(ids)
+    ):
+        categories.setdefault(trip_id, set()).add(category_id)
+
+    themes: Dict[int, set] = {}
+    for trip_id, theme in db.query(TripTheme.trip_id, TripTheme.theme).filter(TripTheme.trip_id.in_(ids)):
+        themes.setdefault(trip_id, set()).add(theme.lower())
+
+    return _Catalogue(
+        ids=np.array(ids, dtype=np.int64),
+        categories=_one_hot(ids, categories),
+        themes=_one_hot(ids, themes),
+        destination=np.array([t.destination_id or 0 for t in trips], dtype=np.int64),
+        days=np.array([np.nan if t.days is None else t.days for t in trips], dtype=np.float64),
+        log_price=np.log1p(np.array([np.nan if t.min_price is None else t.min_price for t in trips], dtype=np.float64)),
+    )
+
+
+def _jaccard(matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    intersection = matrix[rows] @ matrix.T
+    sizes = matrix.sum(axis=1)
+    union = sizes[rows, None] + sizes[None, :] - intersection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def _closeness(values: np.ndarray, rows: np.ndarray, span: float) -> np.ndarray:
+    # 1 when equal, falling linearly to 0 at `span` apart; 0 when either is unknown
+    distance = np.abs(values[rows, None] - values[None, :])
+    return np.nan_to_num(np.clip(1.0 - distance / span, 0.0, 1.0), nan=0.0)
+
+
+def _score_rows(catalogue: _Catalogue, rows: np.ndarray) -> np.ndarray:
+    """Similarity of the trips at `rows` to every trip: (len(rows), trips); self is -inf."""
+    w = RELATED_WEIGHTS
+    scores = (
+        w["category"] * _jaccard(catalogue.categories, rows)
+        + w["theme"] * _jaccard(catalogue.themes, rows)
+        + w["destination"] * (catalogue.destination[rows, None] == catalogue.destination[None, :])
+        + w["duration"] * _closeness(catalogue.days, rows, RELATED_DURATION_SPAN)
+        + w["price"] * _closeness(catalogue.log_price, rows, RELATED_PRICE_SPAN)
+    )
+    scores[np.arange(len(rows)), rows] = -np.inf
+    return scores
+
+
+def _top_k(scores: np.ndarray, k: int) -> tuple:
+    """(column indices, scores) of each row's k best, best first."""
+    k = min(k, scores.shape[1] - 1)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def _write_rows(db: Session, catalogue: _Catalogue, rows: np.ndarray) -> None:
+    """Recompute and replace the stored top-k of the trips at `rows`, a block at a time."""
+    for start in range(0, len(rows), TRIP_RELATED_BLOCK_SIZE):
+        block = rows[start:start + TRIP_RELATED_BLOCK_SIZE]
+        best, best_scores = _top_k(_score_rows(catalogue, block), TRIP_RELATED_TOP_K)
+
+        trip_ids = [int(trip_id) for trip_id in catalogue.ids[block]]
+        db.execute(delete(TripRelated).where(TripRelated.trip_id.in_(trip_ids)))
+        values = [
+            {"trip_id": trip_id, "rank": rank, "related_trip_id": int(catalogue.ids[column]), "score": float(score)}
+            for trip_id, columns, scores in zip(trip_ids, best, best_scores)
+            for rank, (column, score) in enumerate((c, s) for c, s in zip(columns, scores) if s > 0)
+        ]
+        if values:
+            db.execute(insert(TripRelated.__table__), values)
+
+
+# ---------------------------
+# Refresh (caller commits)
+# ---------------------------
+def rebuild_related_trips(db: Session, user_id: int) -> None:
+    """Recompute the top-k of every trip of the tenant."""
+    catalogue = _load_catalogue(db, user_id)
+    _write_rows(db, catalogue, np.arange(len(catalogue.ids)))
+
+
+def _referencing_trips(db: Session, trip_ids: Iterable[int]) -> set:
+    """Trips whose stored list holds one of `trip_ids`."""
+    return {
+        trip_id for (trip_id,) in db.query(TripRelated.trip_id).filter(TripRelated.related_trip_id.in_(list(trip_ids)))
+    }
+
+
+def refresh_related_trips(
+    db: Session, user_id: int, trip_ids: Iterable[int], referencing: Optional[Iterable[int]] = None
+) -> None:
+    """
+    Incremental refresh after the given trips were created, changed or deleted.
+    Recomputed: the trips themselves, every trip whose stored list holds one
+    of them (`referencing`, read now when not given), and every trip that now
+    scores one of them above its k-th entry (above 0 while its list is short).
+    Everything else is left as is.
+    """
+    changed = set(trip_ids)
+    if referencing is None:
+        # Read before the flush: deleting a trip cascades away the rows pointing at it
+        with db.no_autoflush:
+            referencing = _referencing_trips(db, changed)
+        db.flush()
+    referencing = set(referencing)
+
+    catalogue = _load_catalogue(db, user_id)
+    if not len(catalogue.ids):
+        return
+    position = {trip_id: i for i, trip_id in enumerate(catalogue.ids.tolist())}
+    present = np.array([position[t] for t in changed if t in position], dtype=np.int64)
+
+    # k-th stored score per trip, for trips whose list is full
+    kth_score: Dict[int, float] = {}
+    for row in db.query(TripRelated.trip_id, TripRelated.score).filter(
+        TripRelated.trip_id.in_(list(position)), TripRelated.rank == TRIP_RELATED_TOP_K - 1
+    ):
+        kth_score[row.trip_id] = row.score
+
+    # Best score each trip gives any changed trip (similarity is symmetric)
+    if len(present):
+        incoming = _score_rows(catalogue, present).max(axis=0)
+    else:
+        incoming = np.full(len(catalogue.ids), -np.inf)
+
+    dirty = set(present.tolist())
+    for trip_id, i in position.items():
+        if trip_id in referencing or incoming[i] > kth_score.get(trip_id, 0.0):
+            dirty.add(i)
+
+    if dirty:
+        _write_rows(db, catalogue, np.array(sorted(dirty), dtype=np.int64))
+
+
+# ---------------------------
+# Deferred refresh: trip writes queue it, the endpoint runs it after the response
+# ---------------------------
+def mark_related_trips_stale(db: Session, user_id: int, trip_ids: Iterable[int]) -> None:
+    """
+    Queue a refresh of the related lists around `trip_ids` for after `db`
+    commits, so the write transaction never loads the catalogue. The trips
+    listing them are read now: deleting a trip cascades those rows away.
+    """
+    changed = set(trip_ids)
+    with db.no_autoflush:
+        referencing = _referencing_trips(db, changed)
+    stale = db.info.setdefault("stale_related_trips", {})
+    trips, listing = stale.setdefault(user_id, (set(), set()))
+    trips.update(changed)
+    listing.update(referencing)
+
+
+def take_stale_related_trips(db: Session) -> List[Tuple[int, List[int], List[int]]]:
+    """(user_id, trip_ids, referencing) per refresh queued on a committed `db`; clears the queue."""
+    return [
+        (user_id, sorted(trips), sorted(listing))
+        for user_id, (trips, listing) in db.info.pop("stale_related_trips", {}).items()
+    ]
+
+
+def refresh_related_trips_in_background(user_id: int, trip_ids: List[int], referencing: List[int]) -> None:
+    """
+    Run a refresh queued by mark_related_trips_stale. Own session on the
+    primary, commits. If it fails (e.g. a concurrent refresh of the same
+    lists), the lists stay as they were until the next write around them.
+    """
+    if SessionLocal is None:
+        return
+    db = SessionLocal()
+    db.info["user_id"] = user_id
+    db.info["pinned_to_primary"] = True
+    try:
+        refresh_related_trips(db, user_id, trip_ids, referencing)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to refresh related trips around trips {trip_ids}: {e}")
+    finally:
+        db.close()
+
+
+# ---------------------------
+# Background backfill (own session, commits)
+# ---------------------------
+def backfill_related_trips(user_id: int, trip_id: int) -> None:
+    """
+    Compute the list of a trip saved before trip_related existed. Scheduled
+    by GET /trips/{id}/related as a background task when it finds no rows,
+    so the read itself never writes; a no-op when the list is already there.
+    """
+    if SessionLocal is None:
+        return
+    db = SessionLocal()
+    db.info["user_id"] = user_id
+    try:
+        if db.query(TripRelated.trip_id).filter(TripRelated.trip_id == trip_id).first() is None:
+            catalogue = _load_catalogue(db, user_id)
+            rows = np.flatnonzero(catalogue.ids == trip_id)
+            if len(rows):
+                _write_rows(db, catalogue, rows)
+                db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to backfill related trips of trip {trip_id}: {e}")
+    finally:
+        db.close()
@@ -1,14 +1,17 @@
 from datetime import datetime, timedelta
 from models.api_key import APIKey
 from models.user import User
-from core.database import get_db, SessionLocal
+from core.database import get_db, engine, async_engine, replica_engines
+from core.pool import start_pool_stats_logger
 from schemas.user import LoginRequest, LoginResponse, UserStatus
 from fastapi import FastAPI, Depends, File, UploadFile, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.status import HTTP_400_BAD_REQUEST
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+import logging
 import shutil
+from contextlib import asynccontextmanager
 from fastapi.responses import JSONResponse
 from typing import List
 
@@ -18,8 +21,7 @@ from api.global_delete import router as global_delete_router
 # Add is_deleted dynamically (auto patch)
 from utils.add_is_deleted import add_is_deleted_to_all_models
 
-# Global filter (auto apply user_id + is_deleted)
-from utils.global_filter import *
+# Global filter (auto apply user_id + is_deleted) lives in core.database.TenantSession
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -33,6 +35,9 @@ from api.view_enquireform import enquire_router
 from api.booking_request import booking_router
 from api.trip_inquiries import trip_inquiry_router
 from core.security import verify_api_key
+from core.middleware import TenantMiddleware
+from core.compression import CompressionMiddleware
+from utils.response import ORJSONResponse
 from api.user import user_router
 
 # ========== UPDATED: Added landing_page to imports ==========
@@ -51,15 +56,8 @@ from api.user_smtp import router as user_smtp_router
 # --------------------------------------------------------------
 secure_app = FastAPI(
     title="Travel CRM",
-    dependencies=[Depends(verify_api_key)]
-)
-
-secure_app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    dependencies=[Depends(verify_api_key)],
+    default_response_class=ORJSONResponse
 )
 
 @secure_app.get("/")
@@ -111,15 +109,8 @@ add_is_deleted_to_all_models()
 public_app = FastAPI(
     title="User Access",
     docs_url="/docs",
-    openapi_url="/openapi.json"
-)
-
-public_app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 public_app.include_router(user_router, prefix="/api/users", tags=["Users"])
@@ -128,29 +119,23 @@ public_app.include_router(enquire_router, prefix="/api/enquires", tags=["Enquire
 # --------------------------------------------------------------
 # ROOT GATEWAY APP
 # --------------------------------------------------------------
-app = FastAPI(title="Travel CRM Gateway")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool counters go to the logs (DB_POOL_STATS_LOG_INTERVAL), not the tenant API.
+    # basicConfig is a no-op when the server already configured logging.
+    logging.basicConfig()
+    logging.getLogger("core.pool").setLevel(logging.INFO)
+    stop_pool_stats = start_pool_stats_logger({
+        "primary": engine,
+        "async": async_engine.sync_engine if async_engine else None,
+        **{f"replica-{i}": e for i, e in enumerate(replica_engines)},
+    })
+    yield
+    if stop_pool_stats:
+        stop_pool_stats.set()
 
-# --------------------------------------------------------------
-# TENANT MIDDLEWARE (x-api-key → request.state.user_id)
-# --------------------------------------------------------------
-@app.middleware("http")
-async def attach_user_id_to_request(request: Request, call_next):
-    x_api_key = request.headers.get("x-api-key")
-    request.state.user_id = None
-
-    if x_api_key:
-        db = None
-        try:
-            db = SessionLocal()
-            api_row = db.query(APIKey).filter(APIKey.key_value == x_api_key).first()
-            if api_row:
-                request.state.user_id = int(api_row.user_id)
-        finally:
-            if db:
-                db.close()
-
-    response = await call_next(request)
-    return response
+
+app = FastAPI(title="Travel CRM Gateway", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # --------------------------------------------------------------
 # MOUNT secure + public apps
@@ -158,7 +143,17 @@ async def attach_user_id_to_request(request: Request, call_next):
 app.mount("/secure", secure_app)
 app.mount("/public", public_app)
 
-# CORS for gateway
+# --------------------------------------------------------------
+# TENANT MIDDLEWARE (x-api-key → request.state.principal / user_id)
+# --------------------------------------------------------------
+app.add_middleware(TenantMiddleware)
+
+# --------------------------------------------------------------
+# RESPONSE COMPRESSION (Accept-Encoding: br / gzip)
+# --------------------------------------------------------------
+app.add_middleware(CompressionMiddleware)
+
+# CORS for gateway (covers the mounted secure + public apps)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -19,6 +19,8 @@ class Destination(Base):
     hero_banner_images = Column(Text)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Bumped in SQL by every UPDATE of the row: the ETag version
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
 
     primary = relationship("Destination", remote_side=[id])
     trips = relationship("DestinationTrip", cascade="all, delete-orphan", back_populates="destination")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, JSON, Index
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, JSON, Index, text
 from sqlalchemy.sql import func
 from core.database import Base
 
@@ -148,6 +148,8 @@ class LandingPage(Base):
     # ===== TIMESTAMPS =====
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped in SQL by every UPDATE of the row: the ETag version
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     
     # ===== INDEXES =====
     __table_args__ = (
@@ -1,5 +1,6 @@
 from core.database import Base
-from sqlalchemy import Column, Integer, String, Text
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, Text, text
 
 class GlobalSettings(Base):
     __tablename__ = "global_settings"
@@ -59,4 +60,8 @@ class GlobalSettings(Base):
     email_payment_confirmation = Column(Text)
     email_invoice_due = Column(Text)
     email_trip_updates = Column(Text)
-    email_follow_up = Column(Text)
\ No newline at end of file
+    email_follow_up = Column(Text)
+
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Bumped in SQL by every UPDATE of the row: the ETag version
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
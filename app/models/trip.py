@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float, Boolean, Index, LargeBinary
+from sqlalchemy.dialects.mysql import LONGBLOB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
-from sqlalchemy import JSON
+from sqlalchemy import JSON, text
 
 # -------------------- Trip Core --------------------
 
@@ -41,12 +42,36 @@ class Trip(Base):
     display_order = Column(Integer, nullable=True)  # ✅ Made nullable
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Bumped in SQL by every UPDATE of the row: the document cache / ETag version
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
+
+    # Derived from pricing.data on every write (crud.trip.derive_trip_price_fields)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    currency = Column(String(3), nullable=True)
+    next_departure = Column(DateTime, nullable=True)
 
     # Relationships
-    itinerary = relationship("Itinerary", back_populates="trip", cascade="all, delete-orphan")
+    itinerary = relationship(
+        "Itinerary", back_populates="trip", cascade="all, delete-orphan",
+        order_by="[Itinerary.position, Itinerary.id]",
+    )
     media = relationship("TripMedia", uselist=False, back_populates="trip", cascade="all, delete-orphan")
     pricing = relationship("TripPricing", uselist=False, back_populates="trip", cascade="all, delete-orphan")
-    policies = relationship("TripPolicy", back_populates="trip", cascade="all, delete-orphan")
+    policies = relationship(
+        "TripPolicy", back_populates="trip", cascade="all, delete-orphan",
+        order_by="[TripPolicy.position, TripPolicy.id]",
+    )
+    category_links = relationship("TripCategory", cascade="all, delete-orphan", passive_deletes=True)
+    theme_links = relationship("TripTheme", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Keyset pagination (crud.trip.TRIP_SORTS) and price / departure filters
+    __table_args__ = (
+        Index("idx_trips_user_created_id", "user_id", "created_at", "id"),
+        Index("idx_trips_user_display_order_id", "user_id", "display_order", "id"),
+        Index("idx_trips_user_min_price_id", "user_id", "min_price", "id"),
+        Index("idx_trips_user_next_departure", "user_id", "next_departure"),
+    )
 
 # -------------------- Itinerary --------------------
 
@@ -62,6 +87,7 @@ class Itinerary(Base):
     activities = Column(Text)  # comma-separated
     hotel_name = Column(String(255))
     meal_plan = Column(Text)   # comma-separated
+    position = Column(Integer, nullable=False, default=0)  # order within the trip, as the client sent it
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
@@ -104,5 +130,108 @@ class TripPolicy(Base):
     trip_id = Column(Integer, ForeignKey("trips.id"))
     title = Column(String(255))
     content = Column(Text)
+    position = Column(Integer, nullable=False, default=0)  # order within the trip, as the client sent it
+
+    trip = relationship("Trip", back_populates="policies")
+
+# -------------------- Category / Theme Links --------------------
+# Normalized copies of the comma-separated Trip.category_id / Trip.themes
+# columns. Both are written on every create/update (dual-write) and the
+# (value, trip_id) indexes serve the category/theme filters.
+
+class TripCategory(Base):
+    __tablename__ = "trip_categories"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+
+    __table_args__ = (
+        Index("idx_trip_categories_category_trip", "category_id", "trip_id"),
+    )
+
+
+class TripTheme(Base):
+    __tablename__ = "trip_themes"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    theme = Column(String(100), primary_key=True)
+
+    __table_args__ = (
+        Index("idx_trip_themes_theme_trip", "theme", "trip_id"),
+    )
+
+
+# -------------------- Materialized Document --------------------
+# serialize_trip() output as JSON bytes, keyed by the trip's version
+# (the Trip.version counter). Rewritten in the same transaction as every
+# create/update.
+
+class TripDocument(Base):
+    __tablename__ = "trip_documents"
 
-    trip = relationship("Trip", back_populates="policies")
\ No newline at end of file
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(String(32), nullable=False)
+    document = Column(LargeBinary().with_variant(LONGBLOB(), "mysql"), nullable=False)
+    generated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+# -------------------- Search Index --------------------
+# Text the trip search matches on, denormalized from trips, itineraries and
+# destinations so one FULLTEXT index covers it. Rewritten on every trip write.
+
+class TripSearch(Base):
+    __tablename__ = "trip_search"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    title = Column(String(255))
+    body = Column(Text)  # overview, highlights, inclusions, itinerary titles, destination name
+
+    __table_args__ = (
+        Index("ft_trip_search_title", "title", mysql_prefix="FULLTEXT"),
+        Index("ft_trip_search_title_body", "title", "body", mysql_prefix="FULLTEXT"),
+    )
+
+
+# -------------------- Departure Index --------------------
+# One row per departure date: fixed_departure[*] of pricing.data (source
+# "pricing", rewritten with the pricing) and rows of the fixed_departures
+# table (source "fixed_departure", written by its API). The
+# (user_id, start_date) index serves the date-range search.
+
+class TripDeparture(Base):
+    __tablename__ = "trip_departures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    source = Column(String(20), nullable=False)   # "pricing" | "fixed_departure"
+    source_id = Column(Integer, nullable=True)    # fixed_departures.id
+    title = Column(String(255))
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=True)
+    available_slots = Column(Integer, nullable=True)
+    min_price = Column(Float, nullable=True)
+    packages = Column(Text)  # costingPackages JSON
+
+    __table_args__ = (
+        Index("idx_trip_departures_user_start", "user_id", "start_date"),
+        Index("idx_trip_departures_trip_source", "trip_id", "source"),
+    )
+
+
+# -------------------- Related Trips --------------------
+# Precomputed top-k "You may also like" per trip (crud.trip_related), ranked
+# 0..k-1 by similarity within the tenant. Rows are rewritten for the trips a
+# write can affect, so reading the block is one indexed lookup.
+
+class TripRelated(Base):
+    __tablename__ = "trip_related"
+
+    trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True, autoincrement=False)
+    related_trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("idx_trip_related_related", "related_trip_id"),
+    )
@@ -130,6 +130,32 @@ class TripCreate(BaseModel):
     display_order: Optional[int] = None  # ✅ Already optional with default None
 
 
+# -------------------- TripClone --------------------
+
+class TripCloneOverrides(BaseModel):
+    """Fields to change on the copy; anything left out is copied from the source trip."""
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    overview: Optional[str] = None
+    days: Optional[int] = None
+    nights: Optional[int] = None
+    pickup_location: Optional[str] = None
+    drop_location: Optional[str] = None
+    hero_image: Optional[str] = None
+    feature_trip_flag: Optional[bool] = None
+    feature_trip_type: Optional[str] = None
+    meta_title: Optional[str] = None
+    meta_description: Optional[str] = None
+    display_order: Optional[int] = None
+
+    # Overrides are written as given, so an explicit null must not reach a NOT NULL column
+    @field_validator("title")
+    def title_not_null(cls, v):
+        if v is None:
+            raise ValueError("title cannot be null; leave it out to keep the source trip's title")
+        return v
+
+
 # -------------------- TripOut --------------------
 
 class TripOut(BaseModel):
@@ -1,6 +1,6 @@
 # app/utils/email_config.py
 from core.database import SessionLocal
-from models.api_key import APIKey
+from core.api_key_cache import resolve_api_key
 from models.user import User
 from typing import Optional, Dict
 
@@ -14,10 +14,10 @@ def get_tenant_email_settings_by_api_key(api_key_value: str) -> Optional[Dict]:
 
     db = SessionLocal()
     try:
-        api = db.query(APIKey).filter(APIKey.key_value == api_key_value).first()
-        if not api:
+        identity = resolve_api_key(api_key_value)
+        if not identity:
             return None
-        user = db.query(User).filter(User.id == api.user_id).first()
+        user = db.query(User).filter(User.id == identity.user_id).first()
         if not user:
             return None
 
@@ -0,0 +1,50 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# core.compression tags the ETag of an encoded body ("abc" -> "abc-gzip")
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong ETag from a resource's version parts (table, id, version counter, ...).
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(candidate) == current for candidate in header.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response when the client already holds `etag`, else None."""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
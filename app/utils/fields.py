@@ -0,0 +1,41 @@
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[frozenset]:
+    """
+    ?fields=title,slug,hero_image -> frozenset of field names (id is always included).
+    None when the parameter is absent: the caller returns every field.
+    """
+    if not fields:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(requested | {"id"})
+
+
+def projection_options(model, fields: Optional[frozenset], relationship_loaders: dict, full_options: Iterable = ()) -> list:
+    """
+    Query options for a sparse fieldset: load_only() the requested columns
+    (field name == column name) plus the loader of each requested relationship
+    (a None loader marks a non-column field that needs none).
+    Relationships that were not requested are never loaded.
+    """
+    if fields is None:
+        return list(full_options)
+
+    columns = [getattr(model, name) for name in fields if name not in relationship_loaders]
+    loaders = [loader for name, loader in relationship_loaders.items() if name in fields and loader is not None]
+    return [load_only(*columns), *loaders]
+
+
+def project(fields: Optional[frozenset], serializers: dict, obj, *args) -> dict:
+    """Run only the requested field serializers (all of them when fields is None)."""
+    if fields is None:
+        return {name: serialize(obj, *args) for name, serialize in serializers.items()}
+    return {name: serialize(obj, *args) for name, serialize in serializers.items() if name in fields}
@@ -1,3 +1,43 @@
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse as _ORJSONResponse, Response
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """
+    orjson renderer: datetime/date/UUID natively, anything else orjson does not
+    know (Decimal, Enum, pydantic models, sets) through jsonable_encoder.
+    """
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+
+def dumps_json(content) -> bytes:
+    return orjson.dumps(
+        content,
+        default=jsonable_encoder,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
 def api_json_response_format(status,message,error_code,data): 
     result_json = {"success" : status,"message" : message,"error_code" : error_code,"data": data} 
     return result_json
+
+
+def api_json_response(status, message, error_code, data) -> ORJSONResponse:
+    """
+    Same body as api_json_response_format, returned as a ready response so
+    FastAPI skips its jsonable_encoder walk over large plain-dict payloads.
+    """
+    return ORJSONResponse(api_json_response_format(status, message, error_code, data))
+
+
+def api_json_raw_response(status, message, error_code, data: bytes, extra: dict = None) -> Response:
+    """
+    Same body as api_json_response, with `data` already serialized to JSON
+    bytes (e.g. a stored trip document): it is spliced in, not re-encoded.
+    `extra` adds top-level keys next to data (e.g. missing_ids).
+    """
+    head = dumps_json({"success": status, "message": message, "error_code": error_code, **(extra or {})})
+    return Response(content=head[:-1] + b',"data":' + data + b"}", media_type="application/json")
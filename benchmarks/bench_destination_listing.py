@@ -0,0 +1,121 @@
+"""
+SELECT count of the destinations listing (GET /api/destinations/) per page size.
+
+    before: lazy loading, every destination pulls its trips, packages (and
+            each package's trips), blogs, activities, testimonials and blog
+            categories on its own (1 + (6 + packages) x N statements)
+    after:  destination_list_loaders() selectin loading (count + 8 statements
+            per page of up to 500 destinations, plus one per further 500
+            custom packages on the page: selectinload's IN chunk size)
+
+Runs against in-memory SQLite and exits non-zero if a page of the listing
+takes more statements than that:
+
+    python benchmarks/bench_destination_listing.py [destinations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from sqlalchemy import create_engine, event
+
+from api.destination import DESTINATION_LIST_FIELDS, DESTINATION_PAGE_MAX, get_all_destinations
+from core.database import Base, TenantSession
+from models.destination import (
+    CustomPackage, CustomPackageTrip, Destination, DestinationActivity, DestinationBlog,
+    DestinationBlogCategory, DestinationTestimonial, DestinationTrip,
+)
+from utils.add_is_deleted import add_is_deleted_to_all_models
+from utils.fields import project
+
+add_is_deleted_to_all_models()
+
+PACKAGES_PER_DESTINATION = 2
+SELECTIN_CHUNK = 500
+
+
+def _max_statements(limit: int) -> int:
+    packages = limit * PACKAGES_PER_DESTINATION
+    return 9 + max(0, -(-packages // SELECTIN_CHUNK) - 1)
+
+
+def _seed(engine, count: int):
+    models = (
+        Destination, DestinationTrip, CustomPackage, CustomPackageTrip, DestinationBlog,
+        DestinationActivity, DestinationTestimonial, DestinationBlogCategory,
+    )
+    Base.metadata.create_all(engine, tables=[m.__table__ for m in models])
+    ids = range(1, count + 1)
+    with engine.begin() as conn:
+        conn.execute(Destination.__table__.insert(), [
+            {"id": i, "user_id": 1, "title": f"Destination {i}", "slug": f"destination-{i}", "is_deleted": False}
+            for i in ids
+        ])
+        conn.execute(DestinationTrip.__table__.insert(), [
+            {"destination_id": i, "trip_id": i, "is_deleted": False} for i in ids
+        ])
+        conn.execute(CustomPackage.__table__.insert(), [
+            {"id": (i - 1) * PACKAGES_PER_DESTINATION + p + 1, "destination_id": i, "title": f"Package {p}", "is_deleted": False}
+            for i in ids for p in range(PACKAGES_PER_DESTINATION)
+        ])
+        conn.execute(CustomPackageTrip.__table__.insert(), [
+            {"package_id": package_id, "trip_id": package_id, "is_deleted": False}
+            for package_id in range(1, count * PACKAGES_PER_DESTINATION + 1)
+        ])
+        for model, column in (
+            (DestinationBlog, "blog_id"),
+            (DestinationActivity, "activity_id"),
+            (DestinationTestimonial, "testimonial_id"),
+            (DestinationBlogCategory, "category_id"),
+        ):
+            conn.execute(model.__table__.insert(), [
+                {"destination_id": i, column: i, "is_deleted": False} for i in ids
+            ])
+
+
+def _lazy_listing(db, limit):
+    destinations = db.query(Destination).filter(Destination.user_id == 1).order_by(Destination.id).limit(limit).all()
+    return [project(None, DESTINATION_LIST_FIELDS, d, db) for d in destinations]
+
+
+def _listing(db, limit):
+    return get_all_destinations(skip=0, limit=limit, fields=None, db=db, user_id=1)
+
+
+def main(count: int = 500):
+    engine = create_engine("sqlite://")
+    _seed(engine, count)
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    failed = []
+    print(f"{'page size':>9} {'before':>16} {'after':>16}")
+    for limit in (10, 100, min(count, DESTINATION_PAGE_MAX)):
+        row = []
+        for fn in (_lazy_listing, _listing):
+            db = TenantSession(engine)
+            db.info["user_id"] = 1
+            statements[0] = 0
+            start = time.perf_counter()
+            fn(db, limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            db.close()
+            row.append(f"{statements[0]:>5} q {elapsed_ms:7.1f} ms")
+        if statements[0] > _max_statements(limit):
+            failed.append((limit, statements[0]))
+        print(f"{limit:>9} {row[0]:>16} {row[1]:>16}")
+
+    for limit, taken in failed:
+        print(f"FAIL: page size {limit} took {taken} statements (limit {_max_statements(limit)})")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,115 @@
+"""
+Per-query overhead of the tenant + soft-delete filtering.
+
+    before: Query.filter monkey-patch (str() of every criterion) + TenantSession.query()
+            calling _entity_zero() on every query
+    after:  one do_orm_execute hook adding a single cached with_loader_criteria on
+            Base (the tenant id is a bound parameter, read at execution time)
+
+Runs against in-memory SQLite so only ORM/compile overhead is measured:
+
+    python benchmarks/bench_query_criteria.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Query, Session
+
+from core.database import TenantSession
+from models.trip import Trip
+from utils.add_is_deleted import add_is_deleted_to_all_models
+
+add_is_deleted_to_all_models()
+
+
+# ---------------------------
+# Previous implementation, kept here for comparison only
+# ---------------------------
+_original_filter = Query.filter
+
+
+def _legacy_filter_with_soft_delete(self, *criteria):
+    try:
+        model = self._primary_entity.entities[0].mapper.class_
+        table = model.__table__
+        if "is_deleted" in table.columns:
+            if not any("is_deleted" in str(c) for c in criteria):
+                criteria = (table.c.is_deleted == 0, *criteria)
+    except Exception:
+        pass
+    return _original_filter(self, *criteria)
+
+
+class LegacyTenantSession(Session):
+    def query(self, *entities, **kwargs):
+        q = super().query(*entities, **kwargs)
+        try:
+            if len(entities) == 1:
+                try:
+                    model_class = q._entity_zero().class_
+                except Exception:
+                    model_class = None
+                if model_class is not None and hasattr(model_class, "user_id"):
+                    uid = self.info.get("user_id")
+                    if uid is not None:
+                        q = q.filter(model_class.user_id == uid)
+        except Exception:
+            pass
+        return q
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+def _time(label, fn, iterations):
+    fn()  # warm the compiled-statement cache
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_query_us = (time.perf_counter() - start) * 1_000_000 / iterations
+    print(f"{label:<45} {per_query_us:9.1f} µs/query")
+    return per_query_us
+
+
+def main(iterations: int = 5000):
+    engine = create_engine("sqlite://")
+    Trip.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(Trip.__table__.insert(), {
+            "id": 1, "user_id": 1, "title": "Ladakh", "destination_id": 1,
+            "destination_type": "Domestic", "is_deleted": False,
+        })
+
+    def run_query(db):
+        return lambda: db.query(Trip).filter(Trip.id == 1).first()
+
+    def run_select(db):
+        return lambda: db.execute(select(Trip).where(Trip.id == 1)).scalars().first()
+
+    plain = Session(engine)
+    baseline = _time("baseline (no filtering) Query", run_query(plain), iterations)
+
+    legacy = LegacyTenantSession(engine)
+    legacy.info["user_id"] = 1
+    Query.filter = _legacy_filter_with_soft_delete
+    try:
+        before = _time("before: monkey-patch Query", run_query(legacy), iterations)
+    finally:
+        Query.filter = _original_filter
+
+    tenant = TenantSession(engine)
+    tenant.info["user_id"] = 1
+    after = _time("after: do_orm_execute Query", run_query(tenant), iterations)
+    _time("after: do_orm_execute select()", run_select(tenant), iterations)
+
+    print()
+    print(f"overhead before: {before - baseline:8.1f} µs/query")
+    print(f"overhead after:  {after - baseline:8.1f} µs/query")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,62 @@
+"""
+Requests per second through the full gateway pipeline (CORS, tenant middleware,
+mounted sub-apps, verify_api_key), without touching MySQL.
+
+    python benchmarks/bench_request_pipeline.py [requests] [concurrency]
+
+The API key is pre-seeded into the in-process cache and the cache's revalidation
+sweep is off, so the numbers measure the request pipeline itself. Run it before and after middleware changes and compare.
+"""
+import asyncio
+import os
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+sys.path.insert(0, APP_DIR)
+os.chdir(APP_DIR)  # main.py mounts ./uploads
+
+import httpx
+
+from core.api_key_cache import APIKeyIdentity, api_key_cache
+from main import app
+
+BENCH_API_KEY = "bench-api-key"
+
+ENDPOINTS = [
+    ("GET /", "/", {}),
+    ("GET /secure/ (api key)", "/secure/", {"x-api-key": BENCH_API_KEY}),
+]
+
+
+async def _run(client: httpx.AsyncClient, path: str, headers: dict, total: int, concurrency: int) -> float:
+    async def worker(count: int):
+        for _ in range(count):
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+
+    per_worker, remainder = divmod(total, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(per_worker + (1 if i < remainder else 0)) for i in range(concurrency)
+    ))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total: int = 5000, concurrency: int = 10):
+    api_key_cache.revalidate_interval = 0
+    api_key_cache.put(BENCH_API_KEY, APIKeyIdentity(user_id=1, tenant_id=1, is_active=True, role="Admin"))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path, headers in ENDPOINTS:
+            await _run(client, path, headers, min(200, total), concurrency)  # warm-up
+            rps = await _run(client, path, headers, total, concurrency)
+            print(f"{label:<30} {rps:10.0f} req/s  ({total} requests, concurrency {concurrency})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    ))
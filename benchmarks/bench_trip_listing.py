@@ -0,0 +1,82 @@
+"""
+SELECT count and wall time of crud.trip.get_trips per page size.
+
+    before: lazy loading, serialize_trip pulls pricing / policies / itinerary
+            per trip (1 + 3N statements)
+    after:  trip_graph_options() selectin loading (4 statements for any page size)
+
+Runs against in-memory SQLite:
+
+    python benchmarks/bench_trip_listing.py [trips]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from sqlalchemy import create_engine, event
+
+from core.database import Base, TenantSession
+from crud.trip import get_trips, serialize_trip
+from models.trip import Itinerary, Trip, TripPolicy, TripPricing
+from utils.add_is_deleted import add_is_deleted_to_all_models
+
+add_is_deleted_to_all_models()
+
+
+def _seed(engine, count: int):
+    tables = [m.__table__ for m in (Trip, TripPricing, TripPolicy, Itinerary)]
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:
+        conn.execute(Trip.__table__.insert(), [
+            {"id": i, "user_id": 1, "title": f"Trip {i}", "destination_id": 1,
+             "destination_type": "Domestic", "is_deleted": False}
+            for i in range(1, count + 1)
+        ])
+        conn.execute(TripPricing.__table__.insert(), [
+            {"trip_id": i, "pricing_model": "fixed", "data": "{}", "is_deleted": False}
+            for i in range(1, count + 1)
+        ])
+        conn.execute(TripPolicy.__table__.insert(), [
+            {"trip_id": i, "title": "Cancellation", "content": "...", "is_deleted": False}
+            for i in range(1, count + 1)
+        ])
+        conn.execute(Itinerary.__table__.insert(), [
+            {"trip_id": i, "day_number": d, "title": f"Day {d}", "is_deleted": False}
+            for i in range(1, count + 1) for d in range(1, 4)
+        ])
+
+
+def _lazy_get_trips(db, user_id, limit):
+    trips = db.query(Trip).filter(Trip.user_id == user_id).order_by(Trip.created_at.desc()).limit(limit).all()
+    return [serialize_trip(t) for t in trips]
+
+
+def main(count: int = 1000):
+    engine = create_engine("sqlite://")
+    _seed(engine, count)
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    print(f"{'page size':>9} {'before':>16} {'after':>16}")
+    for limit in (10, 100, count):
+        row = []
+        for fn in (_lazy_get_trips, lambda db, uid, lim: get_trips(db, uid, limit=lim)):
+            db = TenantSession(engine)
+            db.info["user_id"] = 1
+            statements[0] = 0
+            start = time.perf_counter()
+            fn(db, 1, limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            db.close()
+            row.append(f"{statements[0]:>5} q {elapsed_ms:7.1f} ms")
+        print(f"{limit:>9} {row[0]:>16} {row[1]:>16}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,94 @@
+"""
+Shared fixtures: the secure app on an in-memory SQLite database, with the
+tenant (user_id 1) injected instead of resolved from an API key.
+
+    python -m pytest -q
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import main  # registers every model and patches is_deleted onto them
+import crud.trip
+import crud.trip_related
+from core.auth import Principal, get_principal
+from core.database import Base, TenantSession, current_request_user_id, get_db
+from crud.trip_document import trip_document_cache
+from crud.trip_feed import trip_feed_cache
+
+USER_ID = 1
+API_KEY = "test-key"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    """Process-wide caches are keyed by ids every test database reuses."""
+    yield
+    trip_document_cache._entries.clear()
+    trip_feed_cache._entries.clear()
+    trip_feed_cache._generations.clear()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = TenantSession(engine)
+    session.info["user_id"] = USER_ID
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    # Background tasks open their own sessions
+    background_sessions = sessionmaker(bind=engine, class_=TenantSession)
+    monkeypatch.setattr(crud.trip, "SessionLocal", background_sessions)
+    monkeypatch.setattr(crud.trip_related, "SessionLocal", background_sessions)
+
+    def _get_db():
+        session = TenantSession(engine)
+        session.info["user_id"] = USER_ID
+        current_request_user_id.set(USER_ID)
+        try:
+            yield session
+        finally:
+            current_request_user_id.set(None)
+            session.close()
+
+    app = main.secure_app
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_principal] = lambda: Principal(
+        api_key=API_KEY, user_id=USER_ID, tenant_id=USER_ID, role="Admin", is_active=True
+    )
+    with TestClient(app, headers={"x-api-key": API_KEY}) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def statements(engine):
+    """List of the SQL statements run on `engine`; clear() it before the part to count."""
+    executed = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    yield executed
+    event.remove(engine, "before_cursor_execute", _record)
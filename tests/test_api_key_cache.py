@@ -0,0 +1,76 @@
+"""
+A key revoked or deleted where this worker's ORM hooks cannot see it (another
+worker, a bulk / Core statement) stops resolving from the cache at the next
+revalidation sweep instead of living on until the TTL.
+"""
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.orm import sessionmaker
+
+import core.api_key_cache
+from core.api_key_cache import APIKeyCache, resolve_api_key
+from core.database import TenantSession
+from models.api_key import APIKey
+from models.user import User, UserRole
+
+KEY = "live-key"
+
+
+@pytest.fixture
+def cache(engine, monkeypatch):
+    monkeypatch.setattr(core.api_key_cache, "SessionLocal", sessionmaker(bind=engine, class_=TenantSession))
+    cache = APIKeyCache(ttl=3600, revalidate_interval=3600)
+    monkeypatch.setattr(core.api_key_cache, "api_key_cache", cache)
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{
+            "id": 1, "username": "owner", "email": "owner@example.com", "password_hash": "-",
+            "role": UserRole.Admin, "tenant_id": 1, "is_deleted": False,
+        }])
+        conn.execute(APIKey.__table__.insert(), [{
+            "key_value": KEY, "tenant_id": 1, "user_id": 1, "is_active": True, "is_deleted": False,
+        }])
+    return cache
+
+
+def _sweep_due(cache: APIKeyCache) -> None:
+    cache._next_revalidation = 0
+
+
+def test_warm_key_is_served_from_memory(cache, engine, statements):
+    assert resolve_api_key(KEY).is_active
+    statements.clear()
+
+    assert resolve_api_key(KEY).is_active
+    assert statements == []
+
+
+def test_bulk_deactivation_is_picked_up_by_the_sweep(cache, engine):
+    assert resolve_api_key(KEY).is_active
+    with engine.begin() as conn:
+        conn.execute(update(APIKey).values(is_active=False))
+
+    # No ORM event fired: the entry survives until the sweep
+    assert resolve_api_key(KEY).is_active
+
+    _sweep_due(cache)
+    assert resolve_api_key(KEY).is_active is False
+
+
+def test_bulk_delete_is_picked_up_by_the_sweep(cache, engine):
+    assert resolve_api_key(KEY) is not None
+    with engine.begin() as conn:
+        conn.execute(delete(APIKey))
+
+    _sweep_due(cache)
+    assert resolve_api_key(KEY) is None
+
+
+def test_sweep_keeps_unchanged_keys(cache, engine, statements):
+    assert resolve_api_key(KEY) is not None
+    _sweep_due(cache)
+    statements.clear()
+
+    assert resolve_api_key(KEY).is_active
+    assert len(statements) == 1
+    assert not cache.revalidation_due()
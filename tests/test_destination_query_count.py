@@ -0,0 +1,63 @@
+"""
+Statements per destinations listing page must not grow with the page size:
+destination_list_loaders() selectin-loads every relationship the listing
+projects, one IN query each for a page of up to DESTINATION_PAGE_MAX.
+"""
+import pytest
+
+from api.destination import DESTINATION_PAGE_MAX
+from conftest import USER_ID
+from models.destination import (
+    CustomPackage, CustomPackageTrip, Destination, DestinationActivity, DestinationBlog,
+    DestinationBlogCategory, DestinationTestimonial, DestinationTrip,
+)
+
+
+def _seed(engine, count: int) -> None:
+    """`count` destinations, each with one row of every relationship the listing projects."""
+    ids = range(1, count + 1)
+    with engine.begin() as conn:
+        conn.execute(Destination.__table__.insert(), [
+            {"id": i, "user_id": USER_ID, "title": f"Destination {i}", "slug": f"destination-{i}", "is_deleted": False}
+            for i in ids
+        ])
+        conn.execute(DestinationTrip.__table__.insert(), [
+            {"destination_id": i, "trip_id": i, "is_deleted": False} for i in ids
+        ])
+        conn.execute(CustomPackage.__table__.insert(), [
+            {"id": i, "destination_id": i, "title": f"Package {i}", "is_deleted": False} for i in ids
+        ])
+        conn.execute(CustomPackageTrip.__table__.insert(), [
+            {"package_id": i, "trip_id": i, "is_deleted": False} for i in ids
+        ])
+        for model, column in (
+            (DestinationBlog, "blog_id"),
+            (DestinationActivity, "activity_id"),
+            (DestinationTestimonial, "testimonial_id"),
+            (DestinationBlogCategory, "category_id"),
+        ):
+            conn.execute(model.__table__.insert(), [
+                {"destination_id": i, column: i, "is_deleted": False} for i in ids
+            ])
+
+
+@pytest.mark.parametrize("fields", [None, "title,custom_packages,popular_trip_ids"])
+def test_destination_list_query_count_is_independent_of_page_size(client, engine, statements, fields):
+    _seed(engine, DESTINATION_PAGE_MAX)
+
+    counts = {}
+    for limit in (1, 10, DESTINATION_PAGE_MAX):
+        params = {"limit": limit, **({"fields": fields} if fields else {})}
+        statements.clear()
+        response = client.get("/api/destinations/", params=params)
+        body = response.json()
+        assert body["success"], body
+        assert len(body["data"]) == limit
+        counts[limit] = len(statements)
+
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_destination_list_rejects_pages_above_the_max(client):
+    response = client.get("/api/destinations/", params={"limit": DESTINATION_PAGE_MAX + 1})
+    assert response.status_code == 422
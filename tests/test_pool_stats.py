@@ -0,0 +1,47 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from core.pool import InstrumentedQueuePool, get_pool_stats, log_pool_stats, start_pool_stats_logger
+
+
+def _engine():
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return engine
+
+
+def test_get_pool_stats_reports_checkouts():
+    stats = get_pool_stats(_engine())
+
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert stats["size"] == 2
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] >= 1
+    assert sum(stats["checkout_latency_histogram_ms"].values()) == stats["checkouts"]
+    assert get_pool_stats(None) == {}
+
+
+def test_log_pool_stats_logs_one_line_per_engine(caplog):
+    with caplog.at_level(logging.INFO, logger="core.pool"):
+        log_pool_stats({"primary": _engine(), "async": None})
+
+    assert len(caplog.records) == 1
+    assert "[primary]" in caplog.records[0].getMessage()
+    assert '"checkouts"' in caplog.records[0].getMessage()
+
+
+def test_pool_stats_logger_runs_until_stopped(caplog):
+    with caplog.at_level(logging.INFO, logger="core.pool"):
+        stop = start_pool_stats_logger({"primary": _engine()}, interval=0.01)
+        try:
+            for _ in range(200):
+                if caplog.records:
+                    break
+                stop.wait(0.01)
+        finally:
+            stop.set()
+
+    assert caplog.records
+    assert start_pool_stats_logger({"primary": _engine()}, interval=0) is None
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import core.database
+from core.database import TenantSession, get_db
+from models.trip import Trip
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    """get_db backed by a primary and one replica; yields (primary, replica)."""
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+
+    class RoutedSession(TenantSession):
+        replica_binds = [replica]
+
+    monkeypatch.setattr(core.database, "SessionLocal", sessionmaker(bind=primary, class_=RoutedSession))
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def _first_read_bind(method: str):
+    dependency = get_db(SimpleNamespace(method=method, state=SimpleNamespace(user_id=1)))
+    db = next(dependency)
+    try:
+        return db.get_bind(clause=select(Trip))
+    finally:
+        dependency.close()
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT", "PATCH", "DELETE"])
+def test_write_requests_read_from_the_primary(routed, method):
+    primary, _ = routed
+    assert _first_read_bind(method) is primary
+
+
+@pytest.mark.parametrize("method", ["GET", "HEAD"])
+def test_read_requests_use_a_replica(routed, method):
+    _, replica = routed
+    assert _first_read_bind(method) is replica
@@ -0,0 +1,41 @@
+from crud.trip import get_trip_documents, get_trip_version
+from models.trip import TripDocument
+
+
+def _create_trip(client) -> int:
+    response = client.post("/api/trips/", json={
+        "title": "Spiti", "destination_id": 1, "destination_type": "Domestic",
+        "itinerary": [{"day_number": 1, "title": "Kaza"}],
+    })
+    return response.json()["data"]["id"]
+
+
+def _drop_stored_document(db, trip_id: int) -> None:
+    # As for a trip saved before trip_documents existed
+    db.query(TripDocument).filter(TripDocument.trip_id == trip_id).delete()
+    db.commit()
+
+
+def test_regenerating_a_document_does_not_write(client, db, statements):
+    trip_id = _create_trip(client)
+    _drop_stored_document(db, trip_id)
+    version = get_trip_version(db, trip_id)
+
+    statements.clear()
+    documents, regenerated = get_trip_documents(db, {trip_id: version})
+
+    assert regenerated == [trip_id]
+    assert b'"Kaza"' in documents[trip_id]
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+def test_get_stores_a_regenerated_document_in_the_background(client, db):
+    trip_id = _create_trip(client)
+    _drop_stored_document(db, trip_id)
+
+    response = client.get(f"/api/trips/{trip_id}")
+
+    assert response.status_code == 200
+    assert response.json()["data"]["itinerary"][0]["title"] == "Kaza"
+    stored = db.query(TripDocument.version).filter(TripDocument.trip_id == trip_id).scalar()
+    assert stored == get_trip_version(db, trip_id)
@@ -0,0 +1,90 @@
+"""
+Statements per trip read path must not grow with the number of trips or
+child rows (pricing, policies, itinerary days, category / theme links).
+"""
+import json
+
+import pytest
+
+from conftest import USER_ID
+from models.trip import Itinerary, Trip, TripCategory, TripPolicy, TripPricing, TripTheme
+
+PRICING = json.dumps({
+    "pricing_model": "customized",
+    "customized": {"pricing_type": "per_person", "base_price": 100, "final_price": 100},
+})
+
+
+def _seed(engine, first_id: int, trips: int, children: int) -> None:
+    """`trips` trips from id `first_id` on, each with `children` rows of every child kind."""
+    ids = range(first_id, first_id + trips)
+    with engine.begin() as conn:
+        conn.execute(Trip.__table__.insert(), [
+            {"id": i, "user_id": USER_ID, "title": f"Trip {i}", "destination_id": 1,
+             "destination_type": "Domestic", "slug": f"trip-{i}", "is_deleted": False}
+            for i in ids
+        ])
+        conn.execute(TripPricing.__table__.insert(), [
+            {"trip_id": i, "pricing_model": "customized", "data": PRICING, "is_deleted": False} for i in ids
+        ])
+        conn.execute(TripPolicy.__table__.insert(), [
+            {"trip_id": i, "title": f"Policy {n}", "content": "-", "position": n, "is_deleted": False}
+            for i in ids for n in range(children)
+        ])
+        conn.execute(Itinerary.__table__.insert(), [
+            {"trip_id": i, "day_number": n + 1, "title": f"Day {n + 1}", "position": n, "is_deleted": False}
+            for i in ids for n in range(children)
+        ])
+        conn.execute(TripCategory.__table__.insert(), [
+            {"trip_id": i, "category_id": n + 1, "is_deleted": False} for i in ids for n in range(children)
+        ])
+        conn.execute(TripTheme.__table__.insert(), [
+            {"trip_id": i, "theme": f"theme-{n}", "is_deleted": False} for i in ids for n in range(children)
+        ])
+
+
+def _count(client, statements, url: str) -> int:
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    assert response.json()["success"], response.json()
+    return len(statements)
+
+
+@pytest.mark.parametrize("url", [
+    "/api/trips/",
+    "/api/trips/?sort=price",
+    "/api/trips/?skip=0",
+    "/api/trips/?fields=title,itinerary,policies",
+])
+def test_trip_list_query_count_is_constant(client, engine, statements, url):
+    _seed(engine, first_id=1, trips=3, children=1)
+    small = _count(client, statements, url)
+
+    _seed(engine, first_id=4, trips=60, children=8)
+    large = _count(client, statements, url)
+
+    assert small == large
+
+
+def test_trip_detail_query_count_is_constant(client, engine, statements):
+    _seed(engine, first_id=1, trips=1, children=1)
+    small = _count(client, statements, "/api/trips/1")
+
+    _seed(engine, first_id=2, trips=1, children=40)
+    large = _count(client, statements, "/api/trips/2")
+
+    assert small == large
+
+
+def test_trip_batch_query_count_is_constant(client, engine, statements):
+    _seed(engine, first_id=1, trips=60, children=8)
+
+    counts = []
+    for size in (2, 50):
+        statements.clear()
+        response = client.post("/api/trips/batch", json={"trip_ids": list(range(1, size + 1))})
+        assert len(response.json()["data"]) == size
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
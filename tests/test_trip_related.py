@@ -0,0 +1,46 @@
+"""
+Trip writes only queue the related-trip refresh; the catalogue is loaded and
+trip_related rewritten by the background task after the response.
+"""
+from crud.trip import create_trip
+from crud.trip_related import take_stale_related_trips
+from models.trip import TripRelated
+from schemas.trip import TripCreate
+
+# _load_catalogue's first query: every trip of the tenant
+CATALOGUE_SCAN = "SELECT trips.id AS trips_id, trips.destination_id AS trips_destination_id, trips.days"
+
+
+def _trip(title: str) -> dict:
+    return {
+        "title": title, "destination_id": 7, "destination_type": "Domestic", "days": 5,
+        "category_id": ["1"], "themes": ["mountains"],
+    }
+
+
+def _related_ids(client, trip_id: int) -> list:
+    body = client.get(f"/api/trips/{trip_id}/related").json()
+    assert body["success"], body
+    return [card["id"] for card in body["data"]]
+
+
+def test_trip_write_does_not_recompute_related_trips(db, statements):
+    trip = create_trip(db, TripCreate(**_trip("Manali")), db.info["user_id"])
+
+    assert not any(s.startswith(CATALOGUE_SCAN) for s in statements)
+    assert not any("INSERT INTO trip_related" in s or "DELETE FROM trip_related" in s for s in statements)
+    assert take_stale_related_trips(db) == [(db.info["user_id"], [trip.id], [])]
+
+
+def test_related_lists_follow_create_and_delete(client, db):
+    first = client.post("/api/trips/", json=_trip("Manali")).json()["data"]["id"]
+    second = client.post("/api/trips/", json=_trip("Kasol")).json()["data"]["id"]
+
+    assert _related_ids(client, first) == [second]
+    assert _related_ids(client, second) == [first]
+
+    client.delete(f"/api/trips/{second}")
+
+    # The list of `first` pointed at the deleted trip, so it is recomputed too
+    assert db.query(TripRelated).filter(TripRelated.trip_id == first).count() == 0
+    assert _related_ids(client, first) == []
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+import crud.trip
+from models.trip import Trip
+
+FROZEN_NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+
+
+@pytest.fixture
+def same_second(monkeypatch):
+    """Every write of crud.trip stamps the same updated_at."""
+    monkeypatch.setattr(crud.trip, "datetime", _FrozenDatetime)
+
+
+def _create_trip(client) -> int:
+    response = client.post("/api/trips/", json={
+        "title": "Ladakh",
+        "destination_id": 1,
+        "destination_type": "Domestic",
+        "itinerary": [{"day_number": 1, "title": "Leh"}, {"day_number": 2, "title": "Nubra"}],
+        "policies": [{"title": "Cancellation", "content": "No refunds"}],
+    })
+    body = response.json()
+    assert body["success"], body
+    return body["data"]["id"]
+
+
+def _version(db, trip_id: int) -> int:
+    db.expire_all()
+    return db.query(Trip.version).filter(Trip.id == trip_id).scalar()
+
+
+def test_child_only_edits_in_one_second_bump_the_version(client, db, same_second):
+    trip_id = _create_trip(client)
+    start = _version(db, trip_id)
+
+    client.patch(f"/api/trips/{trip_id}", json={"itinerary": [{"day_number": 1, "title": "Leh"}, {"day_number": 2, "title": "Pangong"}]})
+    after_itinerary = _version(db, trip_id)
+    client.patch(f"/api/trips/{trip_id}", json={"policies": [{"title": "Cancellation", "content": "50% refund"}]})
+    after_policies = _version(db, trip_id)
+
+    assert start < after_itinerary < after_policies
+
+
+def test_patch_of_child_collection_changes_etag_and_document(client, same_second):
+    trip_id = _create_trip(client)
+    client.patch(f"/api/trips/{trip_id}", json={"itinerary": [{"day_number": 1, "title": "Leh"}, {"day_number": 2, "title": "Pangong"}]})
+    first = client.get(f"/api/trips/{trip_id}")
+    etag = first.headers["etag"]
+
+    # Same second as the previous write: only the version tells them apart
+    client.patch(f"/api/trips/{trip_id}", json={"itinerary": [{"day_number": 1, "title": "Leh"}, {"day_number": 2, "title": "Hanle"}]})
+    second = client.get(f"/api/trips/{trip_id}", headers={"If-None-Match": etag})
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert [day["title"] for day in second.json()["data"]["itinerary"]] == ["Leh", "Hanle"]
+
+
+def test_no_op_patch_keeps_the_version(client, db, same_second):
+    trip_id = _create_trip(client)
+    start = _version(db, trip_id)
+
+    client.patch(f"/api/trips/{trip_id}", json={"title": "Ladakh"})
+
+    assert _version(db, trip_id) == start